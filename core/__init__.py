@@ -0,0 +1,61 @@
+"""
+Cœur de calcul de Wellness Studio (sans Streamlit).
+
+Toute la logique (chargement, filtres, KPI, score, streak, points forts /
+attention, recommandations) vit ici sous forme de fonctions pures, afin
+de pouvoir l'importer, la mettre en cache ou la mesurer hors de l'app.
+
+Les sous-modules (et donc pandas) ne sont importés qu'au premier accès à
+l'un de leurs noms : `from core import APP_NAME` reste instantané.
+"""
+from importlib import import_module
+
+APP_NAME = "Wellness Studio"
+
+_EXPORTS = {
+    "COLS": "core.data",
+    "export_csv": "core.data",
+    "export_name": "core.data",
+    "load_df": "core.data",
+    "save_append": "core.data",
+    "save_df": "core.data",
+    "Kpis": "core.calc",
+    "Periods": "core.calc",
+    "clamp": "core.calc",
+    "compute_kpis": "core.calc",
+    "delta": "core.calc",
+    "filter_df": "core.calc",
+    "global_score": "core.calc",
+    "periods_for": "core.calc",
+    "score_status": "core.calc",
+    "streak_days": "core.calc",
+    "streak_of": "core.calc",
+    "Totals": "core.calc",
+    "totals_of": "core.calc",
+    "kpis_from_totals": "core.calc",
+    "window": "core.calc",
+    "Insights": "core.insights",
+    "build_insights": "core.insights",
+    "note_txt": "core.insights",
+    "recommendations": "core.insights",
+    "Change": "core.changes",
+    "ChangeLog": "core.changes",
+    "SessionStore": "core.store",
+    "CommentIndex": "core.search",
+    "tokenize": "core.search",
+    "Dashboard": "core.dashboard",
+    "build_dashboard": "core.dashboard",
+    "Revalidator": "core.worker",
+    "stale_while_revalidate": "core.worker",
+}
+
+__all__ = ["APP_NAME", *_EXPORTS]
+
+
+def __getattr__(name):
+    mod = _EXPORTS.get(name)
+    if mod is None:
+        raise AttributeError(f"module 'core' has no attribute {name!r}")
+    value = getattr(import_module(mod), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,204 @@
+"""
+Génération de rapports en lot (hors Streamlit).
+
+Pour chaque fichier de données et chaque période, on calcule exactement ce
+que montre le tableau de bord : KPI, points forts / attention, note de
+synthèse et exports CSV (période courante + précédente).
+
+Exemple :
+    python -m core.batch data/*.csv --periods 7 30 --out rapports
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core import APP_NAME
+from core.calc import compute_kpis, filter_df, periods_for
+from core.data import export_csv, export_name, load_df
+from core.insights import build_insights, note_txt
+
+PERIODS = [7, 14, 30, 90, 365]
+
+SUMMARY_COLS = [
+    "fichier", "periode_j", "debut", "fin",
+    "total", "minutes", "h_m", "sl_m", "streak", "score", "status", "d_score",
+]
+
+
+# ============================================================
+# CALCUL D'UN FICHIER (exécuté dans un processus du pool)
+# ============================================================
+def report_file(path: Path, periods: Sequence[int], end: Optional[date] = None,
+                folder: Optional[str] = None) -> Dict:
+    """
+    Calcule les rapports d'un fichier pour toutes les périodes demandées.
+    Rien n'est écrit ici : on renvoie les contenus, l'écriture se fait
+    dans le processus principal, dès réception. `folder` : dossier de sortie du
+    fichier (défaut : son nom sans extension).
+    """
+    folder = folder or path.stem
+    out = {"file": path, "outputs": [], "rows": [], "error": None}
+    if not path.exists():  # load_df créerait un CSV vide
+        out["error"] = "fichier introuvable"
+        return out
+
+    df_all = load_df(path)
+    if df_all.empty:
+        out["error"] = "aucune donnée"
+        return out
+
+    end_cur = end or df_all["date"].max()
+    for days in periods:
+        per = periods_for(end_cur, days)
+        df_cur = filter_df(df_all, per.start_cur, per.end_cur)
+        df_prev = filter_df(df_all, per.start_prev, per.end_prev)
+        if df_cur.empty:
+            continue
+
+        k = compute_kpis(df_cur, df_prev)
+        ins = build_insights(k)
+        sub = f"{folder}/{days}j"
+
+        out["outputs"].append((f"{sub}/synthese.txt", note_txt(APP_NAME, per, ins).encode("utf-8")))
+        out["outputs"].append((f"{sub}/{export_name(APP_NAME, per.start_cur, per.end_cur)}", export_csv(df_cur)))
+        if not df_prev.empty:
+            out["outputs"].append((
+                f"{sub}/{export_name(APP_NAME, per.start_prev, per.end_prev, prev=True)}",
+                export_csv(df_prev),
+            ))
+
+        kd = asdict(k)
+        out["rows"].append({
+            "fichier": str(path),
+            "periode_j": days,
+            "debut": per.start_cur.isoformat(),
+            "fin": per.end_cur.isoformat(),
+            **{c: kd[c] for c in SUMMARY_COLS[4:]},
+        })
+    return out
+
+def _report_job(job: Tuple[Path, Sequence[int], Optional[date], str]) -> Dict:
+    try:
+        return report_file(*job)
+    except Exception as e:  # un fichier abîmé ne doit pas arrêter le lot
+        return {"file": job[0], "outputs": [], "rows": [], "error": f"{type(e).__name__}: {e}"}
+
+
+# ============================================================
+# DOSSIERS DE SORTIE (un par fichier d'entrée)
+# ============================================================
+def output_folders(files: Sequence[Path]) -> List[str]:
+    """
+    Chemin de chaque fichier relatif à leur dossier commun, sans extension :
+    u1/bienetre.csv et u2/bienetre.csv → "u1/bienetre" et "u2/bienetre".
+    ValueError si deux entrées tombent sur le même dossier.
+    """
+    paths = [Path(f).resolve() for f in files]
+    if not paths:
+        return []
+    root = Path(os.path.commonpath([p.parent for p in paths]))
+    folders = [p.relative_to(root).with_suffix("").as_posix() for p in paths]
+
+    seen: Dict[str, Path] = {}
+    for f, folder in zip(files, folders):
+        if folder in seen:
+            raise ValueError(f"{seen[folder]} et {f} produiraient le même dossier de sortie « {folder} »")
+        seen[folder] = f
+    return folders
+
+
+# ============================================================
+# ÉCRITURE AU FIL DES RÉSULTATS
+# ============================================================
+def write_outputs(out_dir: Path, results: Iterable[Dict]) -> Tuple[int, int, List[Tuple[str, str]]]:
+    """
+    Écrit les exports de chaque résultat dès qu'il arrive (les contenus ne
+    sont pas gardés, seulement les lignes de synthèse), puis synthese_lot.csv.
+    Renvoie (fichiers écrits, rapports, erreurs).
+    """
+    written = set()
+    rows: List[Dict] = []
+    errors: List[Tuple[str, str]] = []
+    for res in results:
+        for rel, payload in res["outputs"]:
+            p = out_dir / rel
+            p.parent.mkdir(parents=True, exist_ok=True)
+            p.write_bytes(payload)
+            written.add(p)
+        rows.extend(res["rows"])
+        if res["error"]:
+            errors.append((str(res["file"]), res["error"]))
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with open(out_dir / "synthese_lot.csv", "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=SUMMARY_COLS)
+        w.writeheader()
+        w.writerows(rows)
+    return len(written) + 1, len(rows), errors
+
+
+# ============================================================
+# LOT COMPLET (pool de processus)
+# ============================================================
+def run_batch(files: Sequence[Path], periods: Sequence[int], out_dir: Path,
+              end: Optional[date] = None, workers: Optional[int] = None) -> Dict:
+    t0 = time.perf_counter()
+    jobs = [(Path(f), list(periods), end, folder) for f, folder in zip(files, output_folders(files))]
+
+    # résultats consommés au fur et à mesure (map est paresseux, dans l'ordre
+    # des fichiers) : la mémoire du processus principal ne croît pas avec le lot
+    if workers == 1:
+        written, reports, errors = write_outputs(out_dir, map(_report_job, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunk = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+            written, reports, errors = write_outputs(out_dir, pool.map(_report_job, jobs, chunksize=chunk))
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "files": len(jobs),
+        "reports": reports,
+        "written": written,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "files_per_s": len(jobs) / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+# ============================================================
+# LIGNE DE COMMANDE
+# ============================================================
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m core.batch", description="Rapports Wellness Studio en lot.")
+    ap.add_argument("files", nargs="+", type=Path, help="fichiers CSV de sessions")
+    ap.add_argument("--periods", nargs="+", type=int, default=[7], choices=PERIODS, help="périodes en jours (défaut : 7)")
+    ap.add_argument("--out", type=Path, default=Path("rapports"), help="dossier de sortie (défaut : rapports)")
+    ap.add_argument("--end", type=date.fromisoformat, default=None,
+                    help="date de fin AAAA-MM-JJ (défaut : dernière date de chaque fichier)")
+    ap.add_argument("--workers", type=int, default=None, help="nombre de processus (défaut : nb de CPU)")
+    args = ap.parse_args(argv)
+
+    try:
+        stats = run_batch(args.files, args.periods, args.out, args.end, args.workers)
+    except ValueError as e:
+        print(f"erreur : {e}", file=sys.stderr)
+        return 2
+
+    for f, err in stats["errors"]:
+        print(f"[ignoré] {f} : {err}", file=sys.stderr)
+    print(
+        f"{stats['files']} fichier(s), {stats['reports']} rapport(s), {stats['written']} fichier(s) écrit(s) "
+        f"en {stats['elapsed_s']:.2f} s — {stats['files_per_s']:.1f} fichiers/s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
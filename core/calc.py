@@ -0,0 +1,165 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterable, Optional, Sequence, Tuple
+
+import pandas as pd
+
+
+# ============================================================
+# OUTILS DE CALCUL (score, tendance, filtres)
+# ============================================================
+def clamp(x, a, b):
+    return max(a, min(b, x))
+
+def streak_days(df: pd.DataFrame) -> int:
+    if df.empty:
+        return 0
+    return streak_of(sorted(set(df["date"])))
+
+def streak_of(days: Sequence[date]) -> int:
+    """Jours consécutifs en fin de liste (jours distincts, triés)."""
+    if not days:
+        return 0
+    s = 1
+    for i in range(len(days) - 1, 0, -1):
+        if (days[i] - days[i - 1]).days == 1:
+            s += 1
+        else:
+            break
+    return s
+
+def global_score(h: float, sl: float, mins: int, streak: int) -> int:
+    s_h  = (h / 5) * 35
+    s_sl = clamp(sl / 8, 0, 1) * 35
+    s_m  = clamp(mins / 600, 0, 1) * 20
+    s_st = clamp(streak / 10, 0, 1) * 10
+    return int(round(s_h + s_sl + s_m + s_st))
+
+def score_status(s: int) -> str:
+    if s >= 85: return "Excellence"
+    if s >= 70: return "Très satisfaisant"
+    if s >= 55: return "Satisfaisant"
+    if s >= 40: return "À renforcer"
+    return "Priorité récupération"
+
+def delta(cur, prev):
+    if prev is None:
+        return None
+    try:
+        return cur - prev
+    except Exception:
+        return None
+
+def window(df: pd.DataFrame, start: date, end: date) -> pd.DataFrame:
+    if df.empty:
+        return df
+    return df[(df["date"] >= start) & (df["date"] <= end)].copy()
+
+
+# ============================================================
+# PÉRIODES (courante + précédente de même durée)
+# ============================================================
+@dataclass(frozen=True)
+class Periods:
+    start_cur: date
+    end_cur: date
+    start_prev: date
+    end_prev: date
+
+def periods_for(end_cur: date, days: int) -> Periods:
+    start_cur = end_cur - timedelta(days=days - 1)
+    end_prev = start_cur - timedelta(days=1)
+    start_prev = end_prev - timedelta(days=days - 1)
+    return Periods(start_cur, end_cur, start_prev, end_prev)
+
+
+# ============================================================
+# FILTRES (période, activités, seuil de bien-être)
+# ============================================================
+def filter_df(df: pd.DataFrame, start: date, end: date,
+              acts: Optional[Iterable[str]] = None, min_mood: int = 1) -> pd.DataFrame:
+    out = window(df, start, end)
+    if acts:
+        out = out[out["activite"].isin(list(acts))]
+    return out[out["humeur"] >= min_mood]
+
+
+# ============================================================
+# KPI + COMPARAISON
+# ============================================================
+@dataclass(frozen=True)
+class Kpis:
+    total: int
+    minutes: int
+    h_m: float
+    sl_m: float
+    streak: int
+    score: int
+    status: str
+    prev_minutes: Optional[int]
+    prev_hm: Optional[float]
+    prev_slm: Optional[float]
+    prev_streak: Optional[int]
+    prev_score: Optional[int]
+    d_minutes: Optional[int]
+    d_hm: Optional[float]
+    d_slm: Optional[float]
+    d_score: Optional[int]
+
+@dataclass(frozen=True)
+class Totals:
+    """Sommes d'une période : suffisent à recalculer tous les KPI."""
+    count: int
+    minutes: int
+    humeur_sum: float
+    sommeil_sum: float
+    days: Tuple[date, ...]
+
+def totals_of(df: pd.DataFrame) -> Totals:
+    if df.empty:
+        return Totals(0, 0, 0.0, 0.0, ())
+    return Totals(
+        count=len(df),
+        minutes=int(df["duree_min"].sum()),
+        humeur_sum=float(df["humeur"].sum()),
+        sommeil_sum=float(df["sommeil_h"].sum()),
+        days=tuple(sorted(set(df["date"]))),
+    )
+
+def kpis_from_totals(cur: Totals, prev: Totals) -> Kpis:
+    """KPI de la période courante (non vide) + écarts avec la période précédente."""
+    total = cur.count
+    minutes = cur.minutes
+    h_m = cur.humeur_sum / total
+    sl_m = cur.sommeil_sum / total
+    streak = streak_of(cur.days)
+    score = global_score(h_m, sl_m, minutes, streak)
+
+    has_prev = prev.count > 0
+    prev_minutes = prev.minutes if has_prev else None
+    prev_hm = prev.humeur_sum / prev.count if has_prev else None
+    prev_slm = prev.sommeil_sum / prev.count if has_prev else None
+    prev_streak = streak_of(prev.days) if has_prev else None
+    prev_score = global_score(prev_hm, prev_slm, prev_minutes, prev_streak) if has_prev else None
+
+    return Kpis(
+        total=total,
+        minutes=minutes,
+        h_m=h_m,
+        sl_m=sl_m,
+        streak=streak,
+        score=score,
+        status=score_status(score),
+        prev_minutes=prev_minutes,
+        prev_hm=prev_hm,
+        prev_slm=prev_slm,
+        prev_streak=prev_streak,
+        prev_score=prev_score,
+        d_minutes=delta(minutes, prev_minutes),
+        d_hm=delta(h_m, prev_hm),
+        d_slm=delta(sl_m, prev_slm),
+        d_score=delta(score, prev_score),
+    )
+
+def compute_kpis(df_cur: pd.DataFrame, df_prev: pd.DataFrame) -> Kpis:
+    return kpis_from_totals(totals_of(df_cur), totals_of(df_prev))
@@ -0,0 +1,64 @@
+"""
+Journal des modifications (change-data feed) des sessions.
+
+Chaque ajout / suppression produit un événement avec un numéro de version
+croissant. Les structures dérivées (cumuls journaliers, liste des
+activités, caches par période) s'y abonnent et se mettent à jour de façon
+incrémentale au lieu de tout recalculer depuis le CSV.
+"""
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+import pandas as pd
+
+APPEND = "append"
+DELETE = "delete"
+RESET = "reset"
+
+
+@dataclass(frozen=True)
+class Change:
+    version: int
+    kind: str                          # APPEND | DELETE | RESET
+    rows: Tuple[dict, ...] = ()        # lignes ajoutées ou supprimées
+    ids: Tuple[int, ...] = ()          # leurs positions dans le store (avant suppression)
+    df: Optional[pd.DataFrame] = None  # état complet (RESET uniquement)
+
+
+Subscriber = Callable[[Change], None]
+
+
+class ChangeLog:
+    """Flux append / delete avec version monotone et abonnés synchrones."""
+
+    def __init__(self, keep: int = 1000):
+        self.version = 0
+        self._events = deque(maxlen=keep)
+        self._subs: List[Subscriber] = []
+        self._lock = threading.RLock()
+
+    def subscribe(self, fn: Subscriber) -> None:
+        with self._lock:
+            self._subs.append(fn)
+
+    def emit(self, kind: str, rows=(), ids=(), df: Optional[pd.DataFrame] = None) -> Change:
+        with self._lock:
+            self.version += 1
+            ch = Change(self.version, kind, tuple(rows), tuple(ids), df)
+            # on ne garde pas le DataFrame complet dans l'historique
+            self._events.append(Change(ch.version, kind, ch.rows, ch.ids))
+            for fn in self._subs:
+                fn(ch)
+            return ch
+
+    def since(self, version: int) -> Optional[List[Change]]:
+        """Événements postérieurs à `version`, ou None si l'historique ne remonte plus assez loin."""
+        with self._lock:
+            if version >= self.version:
+                return []
+            events = [e for e in self._events if e.version > version]
+            if not events or events[0].version != version + 1:
+                return None
+            return events
@@ -0,0 +1,190 @@
+"""
+Contrôle d'intégrité et compactage du fichier de sessions.
+
+Le fichier est lu par blocs : les lignes invalides (champs en trop ou
+manquants, date illisible, valeur non numérique ou hors bornes, activité
+vide) et les doublons exacts (motif "doublon" : deux sessions identiques le
+même jour peuvent être réelles, elles restent récupérables) sont signalés et
+mis en quarantaine, puis le fichier est réécrit trié par date, de façon
+atomique, et marqué comme validé : load_df le charge ensuite sans contrôles.
+
+Exemple :
+    python -m core.compact data/bienetre.csv
+    python -m core.compact data/bienetre.csv --dry-run
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from core.data import COLS, check_rows, mark_validated
+
+QUARANTINE_COLS = ["ligne", "motif", "contenu"]
+
+
+def quarantine_path(csv_file: Path) -> Path:
+    return csv_file.with_suffix(".quarantine.csv")
+
+
+# ============================================================
+# LECTURE PAR BLOCS
+# ============================================================
+def _record(fields: List[str]) -> str:
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator="").writerow(fields)
+    return buf.getvalue()
+
+def read_chunks(csv_file: Path, chunksize: int = 100_000) -> Iterator[Tuple[pd.DataFrame, List[Dict]]]:
+    """
+    Blocs de (lignes brutes en texte, colonnes COLS, index = n° de ligne du
+    fichier ; enregistrements illisibles déjà écartés).
+    """
+    with open(csv_file, newline="", encoding="utf-8", errors="replace") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        header = [h.strip() for h in header]
+        missing = [c for c in COLS if c not in header and c != "commentaire"]
+        if missing:
+            raise ValueError(f"colonnes manquantes : {', '.join(missing)}")
+
+        width = len(header)
+        rows, lines, bad = [], [], []
+        for fields in reader:
+            if not fields:
+                continue  # ligne vide
+            if len(fields) != width:
+                bad.append({"ligne": reader.line_num, "motif": "nombre de champs incorrect",
+                            "contenu": _record(fields)})
+            else:
+                rows.append(fields)
+                lines.append(reader.line_num)
+            if len(rows) >= chunksize:
+                yield _frame(rows, lines, header), bad
+                rows, lines, bad = [], [], []
+        if rows or bad:
+            yield _frame(rows, lines, header), bad
+
+def _frame(rows: List[List[str]], lines: List[int], header: List[str]) -> pd.DataFrame:
+    raw = pd.DataFrame(rows, columns=header, index=pd.Index(lines, name="ligne"), dtype=object)
+    if "commentaire" not in raw.columns:
+        raw["commentaire"] = ""
+    return raw[COLS]
+
+
+# ============================================================
+# CONTRÔLE + COMPACTAGE
+# ============================================================
+def scan(csv_file: Path, chunksize: int = 100_000) -> Tuple[pd.DataFrame, pd.DataFrame, Dict]:
+    """
+    (lignes valides dédoublonnées et triées par date, lignes écartées —
+    rejetées ou doublons —, stats). Rien n'est écrit.
+    """
+    good, rejected = [], []
+    n = 0
+    for raw, bad in read_chunks(csv_file, chunksize):
+        n += len(raw) + len(bad)
+        rejected.extend(bad)
+        clean, why = check_rows(raw)
+        good.append(clean)
+        ko = why != ""
+        if ko.any():
+            rejected.extend(
+                {"ligne": line, "motif": motif, "contenu": _record(fields)}
+                for line, motif, fields in zip(raw.index[ko], why[ko], raw[ko].itertuples(index=False))
+            )
+
+    df = pd.concat(good) if good else pd.DataFrame(columns=COLS)
+    dup = df.duplicated(keep="first")
+    n_rejected = len(rejected)
+    if dup.any():
+        # contenu tel qu'il serait réécrit (valeurs typées), index = n° de ligne
+        lines = df[dup].to_csv(header=False, index=False, lineterminator="\n").splitlines()
+        rejected.extend({"ligne": line, "motif": "doublon", "contenu": text}
+                        for line, text in zip(df.index[dup], lines))
+    df = df[~dup].sort_values("date", kind="stable").reset_index(drop=True)
+
+    rej = pd.DataFrame(rejected, columns=QUARANTINE_COLS).sort_values("ligne", kind="stable")
+    stats = {
+        "rows": n,
+        "valid": len(df),
+        "rejected": n_rejected,
+        "duplicates": int(dup.sum()),
+        "reasons": rej.loc[rej["motif"] != "doublon", "motif"].value_counts().to_dict(),
+    }
+    return df, rej, stats
+
+def _atomic_write(path: Path, write) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+def compact(csv_file: Path, chunksize: int = 100_000, dry_run: bool = False) -> Dict:
+    """
+    Contrôle le fichier puis, sauf dry_run : ajoute les lignes rejetées et
+    les doublons à la quarantaine, réécrit le fichier propre (remplacement atomique) et le
+    marque comme validé.
+    """
+    t0 = time.perf_counter()
+    df, rej, stats = scan(csv_file, chunksize)
+
+    if not dry_run:
+        # la quarantaine d'abord : une ligne écartée n'est jamais perdue
+        if not rej.empty:
+            q = quarantine_path(csv_file)
+            rej.to_csv(q, mode="a", header=not q.exists(), index=False)
+        _atomic_write(csv_file, lambda f: df.to_csv(f, index=False))
+        mark_validated(csv_file)
+
+    stats["elapsed_s"] = time.perf_counter() - t0
+    return stats
+
+
+# ============================================================
+# LIGNE DE COMMANDE
+# ============================================================
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m core.compact",
+                                 description="Contrôle et compactage d'un fichier de sessions.")
+    ap.add_argument("file", type=Path, help="fichier CSV de sessions")
+    ap.add_argument("--chunksize", type=int, default=100_000, help="lignes par bloc (défaut : 100000)")
+    ap.add_argument("--dry-run", action="store_true", help="rapport seul, sans réécrire le fichier")
+    args = ap.parse_args(argv)
+
+    if not args.file.exists():
+        print(f"{args.file} : fichier introuvable", file=sys.stderr)
+        return 2
+    try:
+        stats = compact(args.file, args.chunksize, args.dry_run)
+    except ValueError as e:
+        print(f"{args.file} : {e}", file=sys.stderr)
+        return 2
+
+    for motif, n in stats["reasons"].items():
+        print(f"  {n:>8}  {motif}")
+    verb = "à écarter" if args.dry_run else f"en quarantaine ({quarantine_path(args.file).name})"
+    print(
+        f"{stats['rows']} ligne(s) lue(s), {stats['valid']} valide(s), {stats['rejected']} {verb}, "
+        f"{stats['duplicates']} doublon(s) {'à écarter' if args.dry_run else 'en quarantaine'} — "
+        f"{stats['elapsed_s']:.2f} s"
+    )
+    return 1 if args.dry_run and (stats["rejected"] or stats["duplicates"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Contenu calculé du tableau de bord pour un état de filtres donné.
+
+Tout ce que l'app affiche (KPI, points forts / attention, recommandations,
+séries des graphiques, table, lignes à exporter) est produit ici, sans Streamlit,
+pour pouvoir être calculé en arrière-plan (voir core.worker).
+"""
+from dataclasses import dataclass, field
+from datetime import date
+from typing import List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from core.calc import Kpis, Periods, compute_kpis, filter_df, periods_for
+from core.insights import Insights, build_insights, recommendations
+from core.store import SessionStore
+
+
+@dataclass(frozen=True)
+class Dashboard:
+    version: int
+    per: Optional[Periods] = None          # None : aucune donnée
+    k: Optional[Kpis] = None               # None : aucune donnée avec ces filtres
+    ins: Optional[Insights] = None
+    reco: List[Tuple[str, str]] = field(default_factory=list)
+    minutes_by_day: Optional[pd.Series] = None
+    mood: Optional[pd.Series] = None
+    sleep: Optional[pd.Series] = None
+    by_activity: Optional[pd.Series] = None
+    table: Optional[pd.DataFrame] = None   # toutes les sessions, plus récentes d'abord
+    labels: List[str] = field(default_factory=list)
+    # lignes des exports (partagées avec le cache du store) : le CSV n'est
+    # produit qu'au rendu des boutons de téléchargement
+    df_cur: Optional[pd.DataFrame] = None
+    df_prev: Optional[pd.DataFrame] = None
+
+
+def session_labels(df: pd.DataFrame) -> List[str]:
+    """Libellés des lignes pour la suppression : "[id] date — activité — durée — bien-être"."""
+    if df.empty:
+        return []
+    return (
+        "[" + df.index.astype(str) + "] " + df["date"].astype(str)
+        + " — " + df["activite"].astype(str)
+        + " — " + df["duree_min"].astype(int).astype(str) + " min"
+        + " — bien-être " + df["humeur"].astype(int).astype(str)
+    ).tolist()
+
+
+def _table(df_all: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+    table = df_all.sort_values("date", ascending=False, kind="stable")
+    return table.reset_index(drop=True), session_labels(table)
+
+
+def build_dashboard(store: SessionStore, days: int, acts: Sequence[str] = (),
+                    min_mood: int = 1, query: str = "") -> Dashboard:
+    # une seule lecture de l'état partagé : tout le Dashboard vient de cette version
+    version, df_all, gen, hits, last_day = store.snapshot(query)
+    if df_all.empty:
+        return Dashboard(version)
+
+    per = periods_for(last_day, days)
+
+    # Résultats par période mis en cache : un ajout / une suppression n'invalide
+    # que les entrées dont la plage contient le jour modifié.
+    fkey = (tuple(sorted(acts)), min_mood)
+    if hits is None:
+        df_cur = store.cache.get(("cur", per.start_cur, per.end_cur, fkey), per.start_cur, per.end_cur,
+                                 lambda: filter_df(df_all, per.start_cur, per.end_cur, acts, min_mood), gen)
+        df_prev = store.cache.get(("prev", per.start_prev, per.end_prev, fkey), per.start_prev, per.end_prev,
+                                  lambda: filter_df(df_all, per.start_prev, per.end_prev, acts, min_mood), gen)
+    else:
+        # recherche : on part des seules lignes trouvées (positions dans df_all)
+        df_hits = df_all.iloc[hits]
+        df_cur = filter_df(df_hits, per.start_cur, per.end_cur, acts, min_mood)
+        df_prev = filter_df(df_hits, per.start_prev, per.end_prev, acts, min_mood)
+
+    # table + libellés : ne dépendent que des données, partagés par tous les filtres
+    # (plage illimitée : toute modification les invalide)
+    table, labels = store.cache.get(("table",), date.min, date.max, lambda: _table(df_all), gen)
+    if df_cur.empty:
+        return Dashboard(version, per, table=table, labels=labels)
+
+    if hits is None:
+        def kpis() -> Kpis:
+            # cumuls journaliers si les données n'ont pas bougé depuis le
+            # snapshot, sinon recalcul sur ses lignes
+            k = store.kpis(per, acts, min_mood, version)
+            return compute_kpis(df_cur, df_prev) if k is None else k
+
+        k = store.cache.get(("kpis", per, fkey), per.start_prev, per.end_cur, kpis, gen)
+    else:
+        k = compute_kpis(df_cur, df_prev)
+
+    d = df_cur.assign(date=pd.to_datetime(df_cur["date"]))
+    return Dashboard(
+        version=version,
+        per=per,
+        k=k,
+        ins=build_insights(k),
+        reco=recommendations(k),
+        minutes_by_day=d.groupby("date")["duree_min"].sum().sort_index(),
+        mood=d.set_index("date")["humeur"],
+        sleep=d.set_index("date")["sommeil_h"],
+        by_activity=df_cur.groupby("activite")["duree_min"].sum().sort_values(ascending=False),
+        table=table,
+        labels=labels,
+        df_cur=df_cur,
+        df_prev=df_prev,
+    )
@@ -0,0 +1,198 @@
+import json
+from datetime import date
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# COLONNES ATTENDUES DANS LE CSV
+# ============================================================
+COLS = ["date", "activite", "duree_min", "intensite", "humeur", "sommeil_h", "commentaire"]
+
+# types d'un fichier validé + bornes (celles du formulaire de saisie)
+DTYPES = {
+    "activite": "str", "duree_min": "int64", "intensite": "int64",
+    "humeur": "int64", "sommeil_h": "float64", "commentaire": "str",
+}
+BOUNDS = {"duree_min": (0, 600), "intensite": (1, 5), "humeur": (1, 5), "sommeil_h": (0.0, 24.0)}
+
+
+# ============================================================
+# VALIDATION DES LIGNES
+# ============================================================
+def check_rows(raw: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    Valide des lignes brutes (colonnes COLS, valeurs en texte).
+    Renvoie (lignes valides typées, motif de rejet par ligne — "" si valide).
+    """
+    why = pd.Series("", index=raw.index, dtype=object)
+
+    def flag(bad: pd.Series, reason: str) -> None:
+        why[bad & (why == "")] = reason  # on garde le premier motif
+
+    out = pd.DataFrame(index=raw.index)
+    d = pd.to_datetime(raw["date"], errors="coerce", format="ISO8601")
+    flag(d.isna(), "date illisible")
+    out["date"] = d.dt.date
+
+    out["activite"] = raw["activite"].fillna("").astype(str).str.strip()
+    flag(out["activite"] == "", "activité manquante")
+
+    for c, (lo, hi) in BOUNDS.items():
+        v = pd.to_numeric(raw[c], errors="coerce")
+        flag(v.isna(), f"{c} non numérique")
+        if DTYPES[c] == "int64":
+            flag(v.notna() & (v != v.round()), f"{c} non entier")
+        flag(v.notna() & ~v.between(lo, hi), f"{c} hors bornes")
+        out[c] = v
+
+    out["commentaire"] = raw["commentaire"].fillna("").astype(str)
+    ok = why == ""
+    return out[ok].astype({c: t for c, t in DTYPES.items() if t != "str"}), why
+
+
+# ============================================================
+# MARQUEUR "FICHIER VALIDÉ" (posé par python -m core.compact)
+# ============================================================
+def marker_path(csv_file: Path) -> Path:
+    return csv_file.with_suffix(".valid.json")
+
+def _stat(csv_file: Path) -> list:
+    st = csv_file.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+def is_validated(csv_file: Path) -> bool:
+    """Le marqueur correspond-il exactement au fichier actuel (taille + date de modif) ?"""
+    try:
+        return json.loads(marker_path(csv_file).read_text(encoding="utf-8")).get("stat") == _stat(csv_file)
+    except (OSError, ValueError, AttributeError):
+        return False
+
+def mark_validated(csv_file: Path) -> None:
+    marker_path(csv_file).write_text(json.dumps({"stat": _stat(csv_file)}), encoding="utf-8")
+
+
+# ============================================================
+# CHARGEMENT DU CSV + NETTOYAGE (robuste)
+# ============================================================
+def load_df(csv_file: Path) -> pd.DataFrame:
+    """
+    Charge le fichier CSV des sessions.
+    - Si le CSV n'existe pas, on le crée vide avec les bonnes colonnes.
+    - On force les types (date, int, float, str) pour éviter les bugs.
+    - Fichier validé (marqueur à jour) : lecture directe, sans contrôles.
+    """
+    if not csv_file.exists():
+        csv_file.parent.mkdir(parents=True, exist_ok=True)
+        df = pd.DataFrame(columns=COLS)
+        df.to_csv(csv_file, index=False)
+        mark_validated(csv_file)
+        return df
+
+    if is_validated(csv_file):
+        try:
+            return _load_validated(csv_file)
+        except (ValueError, KeyError):
+            pass  # marqueur trompeur : on repasse par le chargement robuste
+
+    df = pd.read_csv(csv_file)
+
+    for c in COLS:
+        if c not in df.columns:
+            df[c] = "" if c == "commentaire" else 0
+
+    df = df[COLS].copy()
+
+    if not df.empty:
+        df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.date
+        df = df.dropna(subset=["date"])
+
+        df["duree_min"] = pd.to_numeric(df["duree_min"], errors="coerce").fillna(0).astype(int)
+        df["intensite"] = pd.to_numeric(df["intensite"], errors="coerce").fillna(0).astype(int)
+        df["humeur"] = pd.to_numeric(df["humeur"], errors="coerce").fillna(0).astype(int)
+        df["sommeil_h"] = pd.to_numeric(df["sommeil_h"], errors="coerce").fillna(0).astype(float)
+
+        df["commentaire"] = df["commentaire"].fillna("").astype(str)
+
+    return df
+
+def _load_validated(csv_file: Path) -> pd.DataFrame:
+    try:
+        df = pd.read_csv(csv_file, usecols=COLS, dtype=DTYPES, engine="pyarrow")
+    except ImportError:  # pyarrow absent : lecteur par défaut
+        df = pd.read_csv(csv_file, usecols=COLS, dtype=DTYPES)
+    df = df[COLS]
+    # dates déjà contrôlées (pyarrow les a parfois déjà lues) :
+    # une conversion par jour distinct, pas par ligne
+    codes, days = pd.factorize(df["date"])
+    days = [d if isinstance(d, date) else date.fromisoformat(d) for d in days]
+    df["date"] = np.array(days, dtype=object)[codes]
+    df["commentaire"] = df["commentaire"].fillna("")
+    return df
+
+
+# ============================================================
+# AJOUT D'UNE SESSION (append)
+# ============================================================
+def _can_append(csv_file: Path) -> bool:
+    """Ajout en fin de fichier possible : en-tête = COLS et dernière ligne terminée."""
+    with open(csv_file, "rb") as f:
+        header = f.readline().decode("utf-8", errors="replace").strip()
+        f.seek(0, 2)
+        if f.tell() == 0:
+            return False
+        f.seek(-1, 2)
+        ends_with_newline = f.read(1) == b"\n"
+    return header.split(",") == COLS and ends_with_newline
+
+def save_append(csv_file: Path, row: dict) -> None:
+    """
+    Ajoute une session en fin de fichier, sans relire ni réécrire le CSV.
+    Si le fichier n'a pas le format attendu, on retombe sur une réécriture complète.
+    """
+    if not csv_file.exists():
+        load_df(csv_file)
+
+    new = pd.DataFrame([row], columns=COLS)
+    if _can_append(csv_file):
+        was_valid = is_validated(csv_file)
+        new.to_csv(csv_file, mode="a", header=False, index=False)
+        # fichier validé + ligne valide : le fichier reste validé
+        if was_valid and (check_rows(new.astype(str))[1] == "").all():
+            mark_validated(csv_file)
+        return
+
+    df = load_df(csv_file)
+    df = new if df.empty else pd.concat([df, new], ignore_index=True)
+    df.to_csv(csv_file, index=False)
+
+
+# ============================================================
+# SAUVEGARDE D'UN DF COMPLET (utile après suppression)
+# ============================================================
+def save_df(csv_file: Path, df: pd.DataFrame) -> None:
+    """
+    Réécrit tout le fichier. Le marqueur de validation est conservé si le
+    fichier était validé (df en provient) ou si df est vide.
+    """
+    for c in COLS:
+        if c not in df.columns:
+            df[c] = "" if c == "commentaire" else 0
+    df = df[COLS].copy()
+    was_valid = csv_file.exists() and is_validated(csv_file)
+    df.to_csv(csv_file, index=False)
+    if was_valid or df.empty:
+        mark_validated(csv_file)
+
+
+# ============================================================
+# EXPORTS CSV (mêmes fichiers que les boutons de téléchargement)
+# ============================================================
+def export_csv(df: pd.DataFrame) -> bytes:
+    return df.to_csv(index=False).encode("utf-8")
+
+def export_name(app_name: str, start: date, end: date, prev: bool = False) -> str:
+    tag = "export_prev" if prev else "export"
+    return f"{app_name.lower().replace(' ','_')}_{tag}_{start.strftime('%Y%m%d')}_{end.strftime('%Y%m%d')}.csv"
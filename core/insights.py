@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from core.calc import Kpis, Periods
+
+
+# ============================================================
+# POINTS FORTS / ATTENTION + SYNTHÈSE
+# ============================================================
+@dataclass(frozen=True)
+class Insights:
+    forts: List[str]
+    att: List[str]
+    syn1: str
+    syn2: str
+
+def build_insights(k: Kpis) -> Insights:
+    forts, att = [], []
+
+    if k.d_minutes is not None:
+        if k.d_minutes >= 60: forts.append("Activité en nette hausse (volume en progression).")
+        if k.d_minutes <= -60: att.append("Activité en retrait (relance recommandée).")
+
+    if k.d_slm is not None:
+        if k.d_slm >= 0.25: forts.append("Sommeil en amélioration.")
+        if k.d_slm <= -0.25: att.append("Sommeil en baisse (risque sur énergie / récupération).")
+
+    if k.d_hm is not None:
+        if k.d_hm >= 0.25: forts.append("Bien-être en progression.")
+        if k.d_hm <= -0.25: att.append("Bien-être en baisse (surveiller charge / récupération).")
+
+    if k.d_score is not None:
+        if k.d_score >= 5: forts.append("Score global en amélioration nette.")
+        if k.d_score <= -5: att.append("Score global en baisse (actions à prioriser).")
+
+    if k.prev_score is None:
+        forts = ["Base de comparaison : première période exploitable en cours de constitution."]
+        att = ["Ajoutez quelques sessions pour fiabiliser les tendances."]
+
+    forts = forts[:3] or ["Indicateurs globalement stables."]
+    att = att[:3] or ["Aucun point d’attention majeur détecté."]
+
+    syn1 = f"Score global : {k.score}/100 ({k.status})."
+    if k.d_score is None:
+        syn2 = "Évolution : non disponible (pas de période précédente). Priorités : activité & sommeil."
+    else:
+        trend = "en progression" if k.d_score > 0 else ("stable" if k.d_score == 0 else "en repli")
+        syn2 = f"Évolution : {('+' if k.d_score>=0 else '')}{k.d_score} point(s) vs période précédente ({trend}). Priorités : activité & sommeil."
+
+    return Insights(forts, att, syn1, syn2)
+
+
+# ============================================================
+# NOTE DE SYNTHÈSE (texte copiable / exportable)
+# ============================================================
+def note_txt(app_name: str, p: Periods, ins: Insights) -> str:
+    return (
+        f"SYNTHÈSE — {app_name}\n"
+        f"Période analysée : {p.start_cur.strftime('%d/%m/%Y')} → {p.end_cur.strftime('%d/%m/%Y')}\n"
+        f"Période de comparaison : {p.start_prev.strftime('%d/%m/%Y')} → {p.end_prev.strftime('%d/%m/%Y')}\n\n"
+        f"{ins.syn1}\n{ins.syn2}\n\n"
+        f"POINTS FORTS\n- " + "\n- ".join(ins.forts) +
+        f"\n\nPOINTS D’ATTENTION\n- " + "\n- ".join(ins.att)
+    )
+
+
+# ============================================================
+# RECOMMANDATIONS
+# ============================================================
+def recommendations(k: Kpis) -> List[Tuple[str, str]]:
+    reco = []
+    if k.minutes < 120:
+        reco.append(("Priorité", "Planifier 2 sessions courtes (20–30 min) cette semaine."))
+    else:
+        reco.append(("Maintien", "Alterner intensités (léger / modéré) pour soutenir la régularité."))
+    if k.sl_m < 7:
+        reco.append(("Sommeil", "Stabiliser l’heure de coucher pour améliorer la récupération."))
+    if k.h_m <= 3:
+        reco.append(("Bien-être", "Ajouter une séance douce + exposition extérieure (≥15 min)."))
+    return reco[:4]
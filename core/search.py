@@ -0,0 +1,248 @@
+"""
+Index inversé des commentaires de sessions (recherche plein texte).
+
+Les commentaires sont en français : la tokenisation ignore accents et
+casse ("Fatigué" ≈ "fatigue"). L'index est construit une fois, tenu à jour
+par le journal des modifications (ajout / suppression) et sauvegardé à
+côté du fichier de données pour éviter de le reconstruire au démarrage.
+
+La sauvegarde réécrit tout le fichier : elle est faite après une
+construction complète, puis au plus une fois par SAVE_DELAY secondes après
+des ajouts / suppressions, et à la sortie du processus. Un fichier en retard
+sur les données ne correspond plus à leur signature : il est reconstruit.
+"""
+import atexit
+import json
+import os
+import re
+import tempfile
+import threading
+import unicodedata
+import weakref
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.changes import APPEND, RESET, Change
+
+TOKEN = re.compile(r"[a-z0-9]+")
+ACCENTS = re.compile("[\u0300-\u036f]")  # diacritiques combinants (après NFKD)
+# ligatures que NFKD ne décompose pas ("cœur" → "coeur")
+LIGATURES = str.maketrans({"œ": "oe", "Œ": "OE", "æ": "ae", "Æ": "AE"})
+FORMAT = 2  # à incrémenter si la tokenisation change : l'index sauvegardé est reconstruit
+SAVE_DELAY = 30.0  # secondes entre une modification et la sauvegarde de l'index
+
+
+# ============================================================
+# TOKENISATION (sans accents, sans casse)
+# ============================================================
+def fold(text: str) -> str:
+    return ACCENTS.sub("", unicodedata.normalize("NFKD", text.translate(LIGATURES))).casefold()
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN.findall(fold(text or ""))
+
+def _sorted_unique(a: np.ndarray) -> np.ndarray:
+    # tri + masque : bien plus rapide que np.unique sur plusieurs millions d'entiers
+    a = np.sort(a)
+    return a[np.r_[True, a[1:] != a[:-1]]] if a.size else a
+
+
+# ============================================================
+# INDEX
+# ============================================================
+class CommentIndex:
+    """
+    token → identifiants de lignes (tableau trié).
+    Les identifiants sont les positions des lignes dans le store (0..n-1) :
+    une suppression décale les suivantes, l'index les renumérote.
+    """
+
+    def __init__(self, path: Optional[Path] = None, signature: Callable[[], object] = lambda: None,
+                 save_delay: float = SAVE_DELAY):
+        self.path = path
+        self.signature = signature
+        self.save_delay = save_delay
+        self.postings: Dict[str, np.ndarray] = {}
+        self._pending: Dict[str, List[int]] = {}
+        self._vocab: Optional[List[str]] = None
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()  # une sauvegarde à la fois
+        self._data_sig = None  # signature des données que reflète l'index
+        self._timer: Optional[threading.Timer] = None
+
+    # ---------- abonnement au journal ----------
+    def __call__(self, ch: Change) -> None:
+        # appelé par le store sous son verrou, après la mise à jour de sa
+        # signature : celle-ci correspond donc à l'index une fois l'événement appliqué
+        if ch.kind == RESET:
+            if not self.load():
+                self.build(ch.df)
+                self.save()  # hors de self._lock : save prend _save_lock d'abord
+            return
+        with self._lock:
+            if ch.kind == APPEND:
+                for rid, row in zip(ch.ids, ch.rows):
+                    self._add(rid, row.get("commentaire", ""))
+            else:
+                self._delete(ch.ids)
+            self._data_sig = self.signature()
+            self._schedule()
+
+    # ---------- construction ----------
+    def build(self, df: Optional[pd.DataFrame]) -> None:
+        with self._lock:
+            self.postings, self._pending, self._vocab = {}, {}, None
+            self._data_sig = self.signature()
+            if df is None or df.empty:
+                return
+            toks = (
+                df["commentaire"].fillna("").astype(str)
+                .str.translate(LIGATURES).str.normalize("NFKD").str.replace(ACCENTS.pattern, "", regex=True)
+                .str.casefold().str.findall(TOKEN.pattern)
+                .explode().dropna()
+            )
+            if toks.empty:
+                return
+            # une clé entière (token, ligne) par occurrence : un seul tri pour tout regrouper
+            codes, vocab = pd.factorize(toks.to_numpy())
+            ids = toks.index.to_numpy(dtype=np.int64)
+            m = int(ids.max()) + 1
+            code, ids = np.divmod(_sorted_unique(codes.astype(np.int64) * m + ids), m)
+            cut = np.flatnonzero(np.diff(code)) + 1
+            self.postings = dict(zip(vocab[code[np.r_[0, cut]]], np.split(ids, cut)))
+
+    def _add(self, rid: int, text: str) -> None:
+        for tok in set(tokenize(text)):
+            if tok not in self.postings and tok not in self._pending:
+                self._vocab = None
+            self._pending.setdefault(tok, []).append(rid)
+
+    def _flush(self) -> None:
+        for tok, ids in self._pending.items():
+            arr = np.asarray(ids, dtype=np.int64)
+            old = self.postings.get(tok)
+            self.postings[tok] = arr if old is None else np.union1d(old, arr)
+        self._pending = {}
+
+    def _delete(self, ids) -> None:
+        if not ids:
+            return
+        self._flush()
+        removed = _sorted_unique(np.asarray(ids, dtype=np.int64))
+        for tok in list(self.postings):
+            arr = self.postings[tok]
+            if arr[-1] < removed[0]:
+                continue
+            arr = arr[~np.isin(arr, removed, assume_unique=True)]
+            if arr.size == 0:
+                del self.postings[tok]
+                self._vocab = None
+            else:
+                self.postings[tok] = arr - np.searchsorted(removed, arr)
+
+    # ---------- recherche ----------
+    def search(self, query: str) -> Optional[np.ndarray]:
+        """
+        Lignes dont le commentaire contient tous les mots de la requête
+        (chaque mot vaut aussi comme préfixe : "fatig" → fatigue, fatigué...).
+        None si la requête est vide.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return None
+        with self._lock:
+            self._flush()
+            if self._vocab is None:
+                self._vocab = sorted(self.postings)
+            out = None
+            for term in terms:
+                i = bisect_left(self._vocab, term)
+                hits = []
+                while i < len(self._vocab) and self._vocab[i].startswith(term):
+                    hits.append(self.postings[self._vocab[i]])
+                    i += 1
+                if not hits:
+                    return np.empty(0, dtype=np.int64)
+                ids = hits[0] if len(hits) == 1 else _sorted_unique(np.concatenate(hits))
+                out = ids if out is None else np.intersect1d(out, ids, assume_unique=True)
+                if out.size == 0:
+                    break
+            return out
+
+    # ---------- persistance (à côté du CSV) ----------
+    def _schedule(self) -> None:
+        if self.path is None:
+            return
+        _unsaved.add(self)
+        if self._timer is None:
+            self._timer = threading.Timer(self.save_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> None:
+        """Sauvegarde les modifications en attente, s'il y en a."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self not in _unsaved:
+                return
+        if self.path.parent.exists():  # dossier de données retiré : rien à garder
+            self.save()
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._save_lock:
+            # copie sous verrou, écriture hors verrou : les recherches n'attendent pas le disque
+            with self._lock:
+                self._flush()
+                vocab = sorted(self.postings)
+                lens = np.fromiter((self.postings[t].size for t in vocab), dtype=np.int64, count=len(vocab))
+                flat = np.concatenate([self.postings[t] for t in vocab]) if vocab else np.empty(0, dtype=np.int64)
+                meta = json.dumps({"signature": self._data_sig, "format": FORMAT})
+                _unsaved.discard(self)
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.savez(f, vocab=np.asarray(vocab, dtype=str), lens=lens, ids=flat, meta=np.asarray(meta))
+                os.replace(tmp, self.path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+
+    def load(self) -> bool:
+        """Recharge l'index sauvegardé s'il correspond au fichier de données actuel."""
+        if self.path is None or not self.path.exists():
+            return False
+        try:
+            with np.load(self.path, allow_pickle=False) as z:
+                meta = json.loads(str(z["meta"]))
+                sig = self.signature()
+                if sig is None or meta.get("signature") != list(sig) or meta.get("format") != FORMAT:
+                    return False
+                vocab, lens, flat = z["vocab"].tolist(), z["lens"], z["ids"]
+        except (OSError, ValueError, KeyError):
+            return False
+        with self._lock:
+            self.postings = dict(zip(vocab, np.split(flat, np.cumsum(lens)[:-1]))) if vocab else {}
+            self._pending, self._vocab = {}, None
+            self._data_sig = sig
+            _unsaved.discard(self)
+        return True
+
+
+# index modifiés depuis leur dernière sauvegarde (sans les garder en vie)
+_unsaved: "weakref.WeakSet[CommentIndex]" = weakref.WeakSet()
+
+@atexit.register
+def flush_all() -> None:
+    """Sauvegarde tous les index en attente (sortie du processus, fin d'un test de charge...)."""
+    for idx in list(_unsaved):
+        idx.flush()
@@ -0,0 +1,307 @@
+"""
+Données de sessions en mémoire, tenues à jour par le journal des modifications.
+
+Le SessionStore charge le CSV une fois, écrit les ajouts / suppressions sur
+disque et publie un événement par modification. Les abonnés ci-dessous ne
+recalculent que ce que l'événement touche :
+- DailyRollup : sommes par (jour, activité, bien-être) → KPI et streak ;
+- ActivityIndex : activités présentes (options du filtre) ;
+- RangeCache : résultats par période (KPI, lignes filtrées, table),
+  invalidés seulement si un jour modifié tombe dans leur plage ;
+- CommentIndex : recherche plein texte dans les commentaires.
+
+Les lignes du store sont numérotées 0..n-1 (positions), ce qui permet à
+l'index de recherche de renuméroter simplement après une suppression.
+"""
+import threading
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.calc import Kpis, Periods, Totals, kpis_from_totals
+from core.changes import APPEND, DELETE, RESET, Change, ChangeLog
+from core.data import COLS, load_df, save_append, save_df
+from core.search import CommentIndex
+
+
+# ============================================================
+# CUMULS JOURNALIERS
+# ============================================================
+class DailyRollup:
+    """jour → (activité, bien-être) → [sessions, minutes, somme bien-être, somme sommeil]"""
+
+    def __init__(self):
+        self.cells: Dict[date, Dict[Tuple[str, int], List[float]]] = {}
+
+    def __call__(self, ch: Change) -> None:
+        if ch.kind == RESET:
+            self.cells = {}
+            if ch.df is not None and not ch.df.empty:
+                g = ch.df.groupby(["date", "activite", "humeur"]).agg(
+                    n=("duree_min", "size"), m=("duree_min", "sum"), h=("humeur", "sum"), s=("sommeil_h", "sum"),
+                )
+                for (d, act, mood), n, m, h, s in zip(g.index, g["n"], g["m"], g["h"], g["s"]):
+                    self.cells.setdefault(d, {})[(act, int(mood))] = [int(n), int(m), float(h), float(s)]
+            return
+        sign = 1 if ch.kind == APPEND else -1
+        for row in ch.rows:
+            self._add(row, sign)
+
+    def _add(self, row: dict, sign: int) -> None:
+        day = self.cells.setdefault(row["date"], {})
+        key = (row["activite"], int(row["humeur"]))
+        c = day.setdefault(key, [0, 0, 0.0, 0.0])
+        c[0] += sign
+        c[1] += sign * int(row["duree_min"])
+        c[2] += sign * int(row["humeur"])
+        c[3] += sign * float(row["sommeil_h"])
+        if c[0] <= 0:
+            del day[key]
+            if not day:
+                del self.cells[row["date"]]
+
+    def totals(self, start: date, end: date, acts: Iterable[str] = (), min_mood: int = 1) -> Totals:
+        acts = set(acts)
+        n = mins = 0
+        h = sl = 0.0
+        days = []
+        d = start
+        while d <= end:
+            hit = False
+            for (act, mood), c in self.cells.get(d, {}).items():
+                if (acts and act not in acts) or mood < min_mood:
+                    continue
+                n += c[0]; mins += c[1]; h += c[2]; sl += c[3]
+                hit = True
+            if hit:
+                days.append(d)
+            d += timedelta(days=1)
+        return Totals(int(n), int(mins), h, sl, tuple(days))
+
+    def last_day(self) -> Optional[date]:
+        return max(self.cells) if self.cells else None
+
+
+# ============================================================
+# ACTIVITÉS PRÉSENTES (options du filtre)
+# ============================================================
+class ActivityIndex:
+    def __init__(self):
+        self.counts: Counter = Counter()
+
+    def __call__(self, ch: Change) -> None:
+        if ch.kind == RESET:
+            self.counts = Counter() if ch.df is None else Counter(ch.df["activite"])
+            return
+        sign = 1 if ch.kind == APPEND else -1
+        for row in ch.rows:
+            self.counts[row["activite"]] += sign
+        self.counts = +self.counts  # retire les activités tombées à 0
+
+    def options(self) -> List[str]:
+        return sorted(self.counts)
+
+
+# ============================================================
+# CACHE PAR PÉRIODE (invalidation par jour modifié)
+# ============================================================
+class RangeCache:
+    """LRU ; les entrées qui contiennent un DataFrame sont limitées à `max_frames`"""
+
+    def __init__(self, maxsize: int = 256, max_frames: int = 8):
+        self.maxsize = maxsize
+        self.max_frames = max_frames
+        self.generation = 0  # +1 à chaque modification des données
+        self._items: "OrderedDict[Hashable, Tuple[date, date, int, object]]" = OrderedDict()
+        self._frames: "OrderedDict[Hashable, None]" = OrderedDict()  # clés des entrées lourdes
+        self._lock = threading.RLock()
+
+    def __call__(self, ch: Change) -> None:
+        with self._lock:
+            self.generation += 1
+            if ch.kind == RESET:
+                self._items.clear()
+                self._frames.clear()
+                return
+            days = {row["date"] for row in ch.rows}
+            for key in [k for k, (a, b, _, _) in self._items.items() if any(a <= d <= b for d in days)]:
+                self._drop(key)
+
+    def _drop(self, key: Hashable) -> None:
+        del self._items[key]
+        self._frames.pop(key, None)
+
+    def get(self, key: Hashable, start: date, end: date, compute: Callable[[], object],
+            generation: Optional[int] = None):
+        """
+        `generation` : celle des données sur lesquelles `compute` travaille ;
+        si elles ont changé depuis, le résultat est renvoyé sans être gardé.
+        Une entrée calculée sur des données plus récentes n'est pas servie
+        (positions décalées par une suppression) : on recalcule.
+        """
+        with self._lock:
+            if generation is None:
+                generation = self.generation
+            hit = self._items.get(key)
+            # encore présente = intacte depuis son calcul : valable pour toute
+            # génération ultérieure, pas pour une antérieure
+            if hit is not None and hit[2] <= generation:
+                self._items.move_to_end(key)
+                if key in self._frames:
+                    self._frames.move_to_end(key)
+                return hit[3]
+        value = compute()
+        with self._lock:
+            if generation != self.generation:
+                return value
+            self._items[key] = (start, end, generation, value)
+            if _holds_frame(value):
+                self._frames[key] = None
+                while len(self._frames) > self.max_frames:
+                    self._drop(next(iter(self._frames)))
+            while len(self._items) > self.maxsize:
+                self._drop(next(iter(self._items)))
+        return value
+
+
+def _holds_frame(value: object) -> bool:
+    if isinstance(value, tuple):
+        return any(isinstance(v, pd.DataFrame) for v in value)
+    return isinstance(value, pd.DataFrame)
+
+
+# ============================================================
+# STORE (CSV + journal + abonnés)
+# ============================================================
+class SessionStore:
+    def __init__(self, csv_file: Path):
+        self.csv_file = csv_file
+        self.log = ChangeLog()
+        self.rollup = DailyRollup()
+        self.activities = ActivityIndex()
+        self.cache = RangeCache()
+
+        self._lock = threading.RLock()
+        self._sig = None
+        self.search = CommentIndex(csv_file.with_suffix(".idx.npz"), signature=lambda: self._sig)
+        for sub in (self.rollup, self.activities, self.cache, self.search):
+            self.log.subscribe(sub)
+
+        self.df = pd.DataFrame(columns=COLS)
+        self.reload()
+
+    @property
+    def version(self) -> int:
+        return self.log.version
+
+    def _signature(self):
+        try:
+            st = self.csv_file.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def reload(self) -> None:
+        with self._lock:
+            self.df = load_df(self.csv_file).reset_index(drop=True)
+            self._sig = self._signature()
+            self.log.emit(RESET, df=self.df)
+
+    def sync(self) -> None:
+        """Recharge si le fichier a été modifié hors de ce store (autre processus, outil...)."""
+        with self._lock:
+            if self._signature() != self._sig:
+                self.reload()
+
+    def append(self, row: dict) -> Change:
+        row = {c: row.get(c, "" if c == "commentaire" else 0) for c in COLS}
+        with self._lock:
+            self.sync()
+            save_append(self.csv_file, row)
+            nxt = len(self.df)
+            new = pd.DataFrame([row], columns=COLS, index=[nxt])
+            self.df = new if self.df.empty else pd.concat([self.df, new])
+            self._sig = self._signature()
+            return self.log.emit(APPEND, rows=[row], ids=[nxt])
+
+    def snapshot(self, query: str = "") -> Tuple[int, pd.DataFrame, int, Optional[np.ndarray], Optional[date]]:
+        """
+        (version, lignes, génération du cache, résultats de la recherche,
+        dernier jour) lus ensemble : les positions trouvées et le dernier jour
+        correspondent bien à ces lignes.
+        """
+        with self._lock:
+            return (self.version, self.df, self.cache.generation, self.search.search(query),
+                    self.rollup.last_day())
+
+    def _rebase(self, ids: List[int], seen: int) -> Optional[List[int]]:
+        """Positions vues à la version `seen` → positions actuelles (None si rechargé depuis)."""
+        events = self.log.since(seen)
+        if events is None or any(e.kind == RESET for e in events):
+            return None
+        for e in events:
+            if e.kind == DELETE and e.ids:
+                gone = set(e.ids)
+                ids = [i - bisect_left(e.ids, i) for i in ids if i not in gone]
+        return ids
+
+    def delete(self, row_ids: Iterable[int], seen: Optional[int] = None) -> Optional[Change]:
+        """
+        Supprime des lignes par position. `seen` : version des données affichées
+        quand les lignes ont été choisies ; les positions sont recalées sur les
+        suppressions faites depuis par d'autres sessions. None si ce n'est plus
+        possible (données rechargées entre-temps). Si aucune ligne ne reste à
+        supprimer, rien n'est écrit ni publié (Change sans `ids`).
+        """
+        with self._lock:
+            self.sync()
+            ids = sorted(set(row_ids))
+            if seen is not None and seen != self.version:
+                ids = self._rebase(ids, seen)
+                if ids is None:
+                    return None
+            ids = [i for i in ids if i in self.df.index]
+            if not ids:
+                return Change(self.version, DELETE)
+            rows = self.df.loc[ids].to_dict("records")
+            self.df = self.df.drop(index=ids).reset_index(drop=True)
+            save_df(self.csv_file, self.df)
+            self._sig = self._signature()
+            return self.log.emit(DELETE, rows=rows, ids=ids)
+
+    def clear(self) -> Change:
+        with self._lock:
+            self.df = pd.DataFrame(columns=COLS)
+            save_df(self.csv_file, self.df)
+            self._sig = self._signature()
+            return self.log.emit(RESET, df=self.df)
+
+    # lectures des structures dérivées : sous verrou, elles peuvent être
+    # appelées depuis un thread de calcul pendant qu'une session écrit
+    def last_day(self) -> Optional[date]:
+        with self._lock:
+            return self.rollup.last_day()
+
+    def kpis(self, per: Periods, acts: Iterable[str] = (), min_mood: int = 1,
+             version: Optional[int] = None) -> Optional[Kpis]:
+        """
+        KPI depuis les cumuls journaliers. None si la période courante est vide,
+        ou si les données ne sont plus celles de `version` (cumuls plus récents).
+        """
+        with self._lock:
+            if version is not None and version != self.version:
+                return None
+            cur = self.rollup.totals(per.start_cur, per.end_cur, acts, min_mood)
+            if cur.count == 0:
+                return None
+            prev = self.rollup.totals(per.start_prev, per.end_prev, acts, min_mood)
+        return kpis_from_totals(cur, prev)
+
+    def activity_options(self) -> List[str]:
+        with self._lock:
+            return self.activities.options()
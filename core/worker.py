@@ -0,0 +1,59 @@
+"""
+Recalcul en arrière-plan (stale-while-revalidate).
+
+Le script Streamlit soumet le calcul pour l'état de filtres courant, affiche
+tout de suite le dernier résultat connu (marqué « en cours de mise à
+jour »), puis le remplace dès que le résultat frais est prêt. Deux
+demandes identiques en vol (même clé) partagent le même calcul ; les
+résultats d'une version périmée des données sont oubliés.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Hashable, Optional, Tuple
+
+
+class Revalidator:
+    def __init__(self, max_workers: int = 2, keep: int = 8):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="wellness-recompute")
+        self._futures: "OrderedDict[Hashable, Tuple[int, Future]]" = OrderedDict()
+        self._keep = keep
+        self._lock = threading.Lock()
+
+    def submit(self, key: Hashable, compute: Callable[[], object], version: int = 0) -> Future:
+        """
+        Futur du calcul pour `key` : réutilise un calcul en vol ou déjà terminé
+        (la clé doit donc inclure `version`, celle des données).
+        """
+        with self._lock:
+            hit = self._futures.get(key)
+            if hit is not None and not (hit[1].done() and hit[1].exception() is not None):
+                self._futures.move_to_end(key)
+                return hit[1]
+            # les résultats d'anciennes versions ne resserviront plus
+            for old in [k for k, (v, _) in self._futures.items() if v < version]:
+                del self._futures[old]
+            fut = self._pool.submit(compute)
+            self._futures[key] = (version, fut)
+            # au-delà de `keep`, on évince les plus anciens calculs terminés
+            done = [k for k, (_, f) in self._futures.items() if f.done()]
+            for old in done[: max(0, len(self._futures) - self._keep)]:
+                del self._futures[old]
+            return fut
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return sum(1 for _, f in self._futures.values() if not f.done())
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+def stale_while_revalidate(fut: Future, last: Optional[object]):
+    """
+    (résultat à afficher tout de suite, est-il périmé ?)
+    Sans résultat précédent, on attend le calcul : il n'y a rien d'autre à montrer.
+    """
+    if fut.done() or last is None:
+        return fut.result(), False
+    return last, True
@@ -0,0 +1,414 @@
+"""
+Test de charge : N sessions simulées du tableau de bord, en parallèle.
+
+Chaque session est pilotée sans navigateur (streamlit.testing AppTest) dans
+son propre thread, sur un même dossier de données : comme plusieurs
+onglets ouverts sur un seul serveur (store, caches et pool de calcul
+partagés). Les sessions changent les filtres, enregistrent des sessions via
+la barre latérale et suppriment des lignes.
+
+Rapport : latence des reruns par action (p50 / p90 / p99 / max), débit,
+mémoire par session et contrôles d'intégrité des données.
+
+Exemple :
+    python loadtest.py --sessions 8 --steps 20
+    python loadtest.py --sessions 4 --rows 100000 --json charge.json
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from core.compact import scan
+from core.data import COLS, load_df
+from core.search import flush_all
+from core.store import SessionStore
+
+ROOT = Path(__file__).resolve().parent
+APP = ROOT / "app.py"
+CSV_NAME = "bienetre.csv"
+
+# versions de Streamlit dont les internes d'AppTest ont été vérifiés
+# (voir _apptest_in_threads) : ils changent sans préavis d'une version à l'autre
+STREAMLIT_TESTED = ("1.66",)
+
+ACTIVITIES = ["Marche", "Course", "Yoga / Pilates", "Musculation", "Vélo", "Natation", "Autre"]
+QUERIES = ["", "", "fatigue", "genou", "bonne", "loadtest"]
+# poids des actions d'une session
+ACTIONS = {"filtre": 6, "ajout": 3, "suppression": 1}
+
+
+# ============================================================
+# DONNÉES DE DÉPART
+# ============================================================
+def synth_rows(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    days = pd.Timestamp(date.today()) - pd.to_timedelta(rng.integers(0, 365, n), unit="D")
+    return pd.DataFrame({
+        "date": days.date,
+        "activite": rng.choice(ACTIVITIES, n),
+        "duree_min": rng.integers(1, 24, n) * 5,
+        "intensite": rng.integers(1, 6, n),
+        "humeur": rng.integers(1, 6, n),
+        "sommeil_h": rng.integers(10, 19, n) / 2,
+        "commentaire": rng.choice(["", "bonne énergie", "fatigue", "genou sensible"], n),
+    }).sort_values("date", kind="stable")[COLS]
+
+def _row_key(r) -> tuple:
+    return (r[0], str(r[1]), int(r[2]), int(r[3]), int(r[4]), float(r[5]), str(r[6]))
+
+def _rows(df: pd.DataFrame) -> Counter:
+    return Counter(_row_key(r) for r in df[COLS].itertuples(index=False))
+
+
+# ============================================================
+# SESSION SIMULÉE
+# ============================================================
+def _widget(seq, label: str):
+    return next((w for w in seq if w.label == label), None)
+
+def _rss_mb() -> float:
+    """Mémoire résidente du processus (Mo)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource  # pic seulement, faute de mieux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _check_streamlit() -> None:
+    import streamlit
+    from streamlit.runtime.runtime import Runtime
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    version = streamlit.__version__
+    if ".".join(version.split(".")[:2]) not in STREAMLIT_TESTED:
+        raise RuntimeError(
+            f"Streamlit {version} non pris en charge par le test de charge "
+            f"(versions vérifiées : {', '.join(STREAMLIT_TESTED)}) : il modifie des "
+            f"internes d'AppTest, à revoir avant d'ajouter la version à STREAMLIT_TESTED."
+        )
+    missing = [name for obj, name in ((local_script_runner, "ScriptCache"),
+                                      (app_test, "patch_config_options"),
+                                      (Runtime, "_instance"))
+               if not hasattr(obj, name)]
+    if missing:
+        raise RuntimeError(f"Streamlit {version} : internes d'AppTest introuvables ({', '.join(missing)}).")
+
+def _apptest_in_threads() -> None:
+    """
+    AppTest est prévu pour un test à la fois ; trois ajustements pour en
+    faire tourner plusieurs en parallèle, comme les sessions d'un serveur :
+    - un seul cache de bytecode partagé (le serveur compile le script une
+      fois ; ast.parse n'est pas sûr entre threads en CPython 3.11),
+    - l'option global.appTest posée une fois pour tout le processus au lieu
+      d'être activée / désactivée autour de chaque rerun,
+    - le runtime simulé (global) n'est jamais retiré sous une session encore
+      en cours : on garde le dernier installé.
+    """
+    _check_streamlit()
+    from streamlit import config
+    from streamlit.runtime.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    shared = ScriptCache()
+    local_script_runner.ScriptCache = lambda: shared
+    config.set_option("global.appTest", True)
+    app_test.patch_config_options = lambda overrides: contextlib.nullcontext()
+
+    last = []
+    def instance(cls):
+        if cls._instance is not None:
+            last[:] = [cls._instance]
+        if not last:
+            raise RuntimeError("Runtime hasn't been created!")
+        return last[0]
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or bool(last))
+
+@dataclass
+class Sim:
+    idx: int
+    rng: random.Random
+    timeout: float
+    at: object = None
+    lat: Dict[str, List[float]] = field(default_factory=dict)
+    appended: List[tuple] = field(default_factory=list)
+    chosen: List[tuple] = field(default_factory=list)   # (date, activité, durée, bien-être) visés
+    errors: List[str] = field(default_factory=list)
+
+    def _run(self, kind: str, widget=None) -> bool:
+        t0 = time.perf_counter()
+        try:
+            self.at = widget.run() if widget is not None else self.at.run(timeout=self.timeout)
+        except Exception as e:  # délai dépassé, etc. : on note et on continue
+            self.errors.append(f"{kind} : {type(e).__name__}: {e}")
+            return False
+        self.lat.setdefault(kind, []).append(time.perf_counter() - t0)
+        if self.at.exception:
+            self.errors.append(f"{kind} : {self.at.exception[0].value}")
+            return False
+        return True
+
+    def open(self) -> None:
+        from streamlit.testing.v1 import AppTest
+        self.at = AppTest.from_file(str(APP), default_timeout=self.timeout)
+        self._run("ouverture")
+
+    # ---------- actions ----------
+    def filtre(self) -> None:
+        at, rng = self.at, self.rng
+        choice = rng.randrange(4)
+        if choice == 0:
+            w = _widget(at.selectbox, "Période")
+            w = w and w.select(rng.choice(w.options))
+        elif choice == 1:
+            w = _widget(at.slider, "Seuil bien-être")
+            w = w and w.set_value(rng.choice([1, 1, 2, 3]))
+        elif choice == 2:
+            w = _widget(at.text_input, "Recherche")
+            w = w and w.input(rng.choice(QUERIES))
+        else:
+            w = _widget(at.multiselect, "Activités")
+            if w is not None and w.options:
+                w = w.set_value(rng.sample(w.options, rng.randint(1, len(w.options))))
+        if w:
+            self._run("filtre", w)
+
+    def ajout(self) -> None:
+        at, rng = self.at, self.rng
+        row = (
+            date.today(), rng.choice(ACTIVITIES), rng.randrange(5, 125, 5), rng.randint(1, 5),
+            rng.randint(1, 5), rng.choice([5.5, 6.0, 6.5, 7.0, 7.5, 8.0]),
+            f"loadtest s{self.idx} n{len(self.appended)}",
+        )
+        sb = at.sidebar
+        _widget(sb.selectbox, "Activité").select(row[1])
+        _widget(sb.number_input, "Durée (min)").set_value(row[2])
+        _widget(sb.slider, "Intensité").set_value(row[3])
+        _widget(sb.slider, "Bien-être").set_value(row[4])
+        _widget(sb.number_input, "Sommeil (h)").set_value(row[5])
+        _widget(sb.text_area, "Commentaire").input(row[6])
+        if self._run("ajout", _widget(sb.button, "Enregistrer").click()):
+            self.appended.append(row)
+
+    def suppression(self) -> None:
+        at, rng = self.at, self.rng
+        sel = _widget(at.selectbox, "Sélectionner la ligne")
+        confirm = _widget(at.checkbox, "Je confirme la suppression")
+        if sel is None or confirm is None or not sel.options:
+            return self.filtre()  # rien à supprimer avec ces filtres
+        label = rng.choice(sel.options)
+        sel.select(label)
+        if not self._run("suppression", confirm.check()):
+            return
+        btn = _widget(self.at.button, "🗑️ Supprimer")
+        now = _widget(self.at.selectbox, "Sélectionner la ligne")
+        if btn is None or now is None or now.value != label:
+            return  # sélection perdue (ligne supprimée ailleurs) : l'utilisateur le voit
+        # "[id] date — activité — N min — bien-être M"
+        d, act, mins, mood = label.split("] ", 1)[1].split(" — ")
+        key = (date.fromisoformat(d), act, int(mins.split()[0]), int(mood.split()[-1]))
+        if self._run("suppression", btn.click()):
+            self.chosen.append(key)
+
+    def play(self, steps: int, started: threading.Barrier, go: threading.Barrier) -> None:
+        try:
+            self.open()
+        finally:
+            started.wait()
+        go.wait()
+        kinds, weights = list(ACTIONS), list(ACTIONS.values())
+        for _ in range(steps):
+            if self.at is None:
+                return
+            try:
+                getattr(self, self.rng.choices(kinds, weights)[0])()
+            except Exception as e:  # widget absent, etc.
+                self.errors.append(f"action : {type(e).__name__}: {e}")
+
+
+# ============================================================
+# CONTRÔLES D'INTÉGRITÉ
+# ============================================================
+def integrity(csv_file: Path, initial: Counter, sims: Sequence[Sim]) -> Dict[str, int]:
+    """
+    Compare le fichier final à tout ce qui a été écrit :
+    - lignes illisibles (format abîmé),
+    - lignes en trop (doublées ou inventées),
+    - lignes perdues (plus de disparitions que de suppressions),
+    - mauvaises lignes supprimées (autre ligne que celle choisie),
+    - index de recherche sauvegardé différent des commentaires.
+    """
+    _, _, stats = scan(csv_file)
+    final_df = load_df(csv_file)
+    final = _rows(final_df)
+
+    written = initial + Counter(_row_key(r) for s in sims for r in s.appended)
+    extra = final - written
+    gone = written - final
+    n_deletes = sum(len(s.chosen) for s in sims)
+
+    chosen = Counter(k for s in sims for k in s.chosen)
+    wrong = 0
+    for r, n in gone.items():
+        key = (r[0], r[1], r[2], r[4])
+        ok = min(n, chosen[key])
+        chosen[key] -= ok
+        wrong += n - ok
+
+    # index rechargé depuis le disque (même signature de fichier) vs parcours direct ;
+    # les sauvegardes différées de la campagne sont faites d'abord
+    flush_all()
+    store = SessionStore(csv_file)
+    hits = store.search.search("loadtest")
+    expected = np.flatnonzero(store.df["commentaire"].str.contains("loadtest", regex=False).to_numpy())
+    index_ok = hits is not None and np.array_equal(np.sort(hits), expected)
+
+    return {
+        "lignes_illisibles": stats["rejected"],
+        "lignes_en_trop": sum(extra.values()),
+        "lignes_perdues": max(0, sum(gone.values()) - n_deletes),
+        "mauvaises_suppressions": wrong,
+        "index_incoherent": int(not index_ok),
+    }
+
+
+# ============================================================
+# CAMPAGNE
+# ============================================================
+def percentiles(xs: Sequence[float]) -> Dict[str, float]:
+    a = np.asarray(xs) * 1000
+    return {
+        "n": int(a.size),
+        **{f"p{q}": float(np.percentile(a, q)) for q in (50, 90, 99)},
+        "max": float(a.max()),
+    }
+
+def run_load(data_dir: Path, sessions: int, steps: int, seed: int = 0, timeout: float = 120) -> Dict:
+    if sessions < 1:
+        raise ValueError("il faut au moins une session")
+    os.environ["WELLNESS_DATA_DIR"] = str(data_dir)
+    csv_file = data_dir / CSV_NAME
+    initial = _rows(load_df(csv_file))
+
+    _apptest_in_threads()
+    # session de chauffe : imports, store partagé, pool de calcul
+    warm = Sim(-1, random.Random(seed), timeout)
+    warm.open()
+    rss0 = _rss_mb()
+
+    sims = [Sim(i, random.Random(seed * 1000 + i), timeout) for i in range(sessions)]
+    started, go = threading.Barrier(sessions + 1), threading.Barrier(sessions + 1)
+    threads = [threading.Thread(target=s.play, args=(steps, started, go), name=f"session-{s.idx}") for s in sims]
+    for t in threads:
+        t.start()
+    started.wait()  # toutes les sessions ouvertes
+    rss1 = _rss_mb()
+    t0 = time.perf_counter()
+    go.wait()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    lat: Dict[str, List[float]] = {}
+    for s in sims:
+        for kind, xs in s.lat.items():
+            lat.setdefault(kind, []).extend(xs)
+    reruns = sum(len(xs) for k, xs in lat.items() if k != "ouverture")
+    all_steps = [x for k, xs in lat.items() if k != "ouverture" for x in xs]
+
+    return {
+        "sessions": sessions,
+        "steps": steps,
+        "rows_initial": sum(initial.values()),
+        "elapsed_s": elapsed,
+        "reruns": reruns,
+        "reruns_per_s": reruns / elapsed if elapsed > 0 else float("inf"),
+        "latency_ms": {k: percentiles(xs) for k, xs in lat.items() if xs}
+                      | ({"total": percentiles(all_steps)} if all_steps else {}),
+        "rss_mb": rss1,
+        "mb_per_session": (rss1 - rss0) / sessions,
+        "appends": sum(len(s.appended) for s in sims),
+        "deletes": sum(len(s.chosen) for s in sims),
+        "errors": [e for s in sims for e in s.errors],
+        "integrity": integrity(csv_file, initial, sims),
+    }
+
+
+# ============================================================
+# LIGNE DE COMMANDE
+# ============================================================
+def print_report(r: Dict) -> None:
+    print(
+        f"{r['sessions']} session(s) × {r['steps']} action(s) sur {r['rows_initial']} ligne(s) — "
+        f"{r['reruns']} rerun(s) en {r['elapsed_s']:.1f} s — {r['reruns_per_s']:.1f} reruns/s"
+    )
+    print(f"{'latence (ms)':<14}{'n':>6}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+    for kind, p in r["latency_ms"].items():
+        print(f"  {kind:<12}{p['n']:>6}{p['p50']:>9.0f}{p['p90']:>9.0f}{p['p99']:>9.0f}{p['max']:>9.0f}")
+    print(f"mémoire : {r['rss_mb']:.0f} Mo (RSS) — {r['mb_per_session']:.1f} Mo / session")
+    print(f"écritures : {r['appends']} ajout(s), {r['deletes']} suppression(s)")
+    bad = {k: v for k, v in r["integrity"].items() if v}
+    print("intégrité : " + (", ".join(f"{k} = {v}" for k, v in bad.items()) if bad else "OK"))
+    for e in r["errors"][:10]:
+        print(f"[erreur] {e}", file=sys.stderr)
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python loadtest.py", description="Test de charge du tableau de bord.")
+    ap.add_argument("--sessions", type=int, default=8, help="sessions simultanées (défaut : 8)")
+    ap.add_argument("--steps", type=int, default=20, help="actions par session (défaut : 20)")
+    ap.add_argument("--rows", type=int, default=None, help="données synthétiques de N lignes (défaut : copie de data/)")
+    ap.add_argument("--source", type=Path, default=ROOT / "data" / CSV_NAME, help="fichier de départ copié")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--timeout", type=float, default=120, help="délai max d'un rerun en secondes")
+    ap.add_argument("--json", type=Path, default=None, help="enregistre le rapport (comparaison entre versions)")
+    ap.add_argument("--keep", action="store_true", help="conserve le dossier de données de test")
+    args = ap.parse_args(argv)
+    if args.sessions < 1:
+        ap.error("--sessions doit valoir au moins 1")
+    try:
+        _check_streamlit()
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    os.chdir(ROOT)  # assets/ relatifs, comme streamlit run
+    data_dir = Path(tempfile.mkdtemp(prefix="wellness-load-"))
+    try:
+        if args.rows is not None:
+            synth_rows(args.rows, args.seed).to_csv(data_dir / CSV_NAME, index=False)
+        elif args.source.exists():
+            shutil.copy(args.source, data_dir / CSV_NAME)
+        report = run_load(data_dir, args.sessions, args.steps, args.seed, args.timeout)
+    finally:
+        if args.keep:
+            print(f"données : {data_dir}")
+        else:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 1 if report["errors"] or any(report["integrity"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
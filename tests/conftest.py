@@ -0,0 +1,28 @@
+import sys
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from core.data import COLS  # noqa: E402
+from core.store import SessionStore  # noqa: E402
+
+
+def row(day: int, activite: str = "Marche", commentaire: str = "", humeur: int = 3) -> dict:
+    return {"date": date(2026, 6, day), "activite": activite, "duree_min": 30,
+            "intensite": 2, "humeur": humeur, "sommeil_h": 7.0, "commentaire": commentaire}
+
+
+@pytest.fixture
+def make_store(tmp_path):
+    """SessionStore sur un CSV temporaire contenant `rows`."""
+    def make(rows=()) -> SessionStore:
+        csv_file = tmp_path / "bienetre.csv"
+        pd.DataFrame(list(rows), columns=COLS).to_csv(csv_file, index=False)
+        return SessionStore(csv_file)
+    return make
@@ -0,0 +1,45 @@
+import csv
+
+import pandas as pd
+import pytest
+
+from conftest import row
+from core.batch import output_folders, run_batch, write_outputs
+from core.data import COLS
+
+
+def _data_file(path, rows):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame(rows, columns=COLS).to_csv(path, index=False)
+    return path
+
+
+def test_output_folders_unique_per_input(tmp_path):
+    files = [tmp_path / "u1" / "bienetre.csv", tmp_path / "u2" / "bienetre.csv"]
+    assert output_folders(files) == ["u1/bienetre", "u2/bienetre"]
+    with pytest.raises(ValueError):
+        output_folders([tmp_path / "a.csv", tmp_path / "a.json"])
+
+
+def test_write_outputs_writes_each_result_as_it_arrives(tmp_path):
+    def results():
+        yield {"file": "a", "outputs": [("a/x.txt", b"1")], "rows": [], "error": None}
+        # le premier résultat est déjà sur disque quand le second est demandé
+        assert (tmp_path / "a" / "x.txt").read_bytes() == b"1"
+        yield {"file": "b", "outputs": [], "rows": [], "error": "aucune donnée"}
+
+    written, reports, errors = write_outputs(tmp_path, results())
+    assert (written, reports, errors) == (2, 0, [("b", "aucune donnée")])
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch_reports_every_file(tmp_path, workers):
+    files = [_data_file(tmp_path / u / "bienetre.csv", [row(1), row(3)]) for u in ("u1", "u2")]
+    out = tmp_path / "out"
+    stats = run_batch(files + [tmp_path / "absent.csv"], [7], out, workers=workers)
+    assert stats["reports"] == 2
+    assert stats["errors"] == [(str(tmp_path / "absent.csv"), "fichier introuvable")]
+    assert (out / "u1" / "bienetre" / "7j" / "synthese.txt").exists()
+    with open(out / "synthese_lot.csv", encoding="utf-8") as f:
+        assert [r["fichier"] for r in csv.DictReader(f)] == [str(p) for p in files]
+    assert stats["written"] == 5  # 2 × (synthèse + export) + synthese_lot.csv
@@ -0,0 +1,105 @@
+from datetime import date
+
+import pandas as pd
+
+from conftest import row
+from core.changes import APPEND, DELETE, RESET, Change, ChangeLog
+from core.dashboard import _table, build_dashboard
+from core.store import RangeCache
+
+
+def test_since_returns_events_after_version():
+    log = ChangeLog()
+    log.emit(APPEND, rows=[row(1)], ids=[0])
+    log.emit(DELETE, rows=[row(1)], ids=[0])
+    assert [e.kind for e in log.since(0)] == [APPEND, DELETE]
+    assert [e.version for e in log.since(1)] == [2]
+    assert log.since(2) == []
+
+
+def test_since_is_none_when_history_too_short():
+    log = ChangeLog(keep=2)
+    for i in range(3):
+        log.emit(APPEND, rows=[row(1)], ids=[i])
+    assert log.since(0) is None
+    assert [e.version for e in log.since(1)] == [2, 3]
+
+
+def test_history_does_not_keep_reset_frame():
+    log = ChangeLog()
+    seen = []
+    log.subscribe(seen.append)
+    log.emit(RESET, df=pd.DataFrame({"a": [1]}))
+    assert seen[0].df is not None
+    assert log.since(0)[0].df is None
+
+
+def test_delete_renumbers_store_positions(make_store):
+    store = make_store([row(1, commentaire=f"r{i}") for i in range(5)])
+    v = store.version
+    store.delete([1, 3])
+    (ch,) = store.log.since(v)
+    assert ch.kind == DELETE and ch.ids == (1, 3)
+    assert [r["commentaire"] for r in ch.rows] == ["r1", "r3"]
+    assert list(store.df.index) == [0, 1, 2]
+    assert list(store.df["commentaire"]) == ["r0", "r2", "r4"]
+
+
+def test_range_cache_drops_entries_containing_changed_day():
+    cache = RangeCache()
+    d1, d5, d9 = date(2026, 6, 1), date(2026, 6, 5), date(2026, 6, 9)
+    cache.get("a", d1, d5, lambda: 1)
+    cache.get("b", d5, d9, lambda: 2)
+    cache(Change(1, APPEND, rows=(row(8),), ids=(0,)))
+    assert cache.get("a", d1, d5, lambda: -1) == 1
+    assert cache.get("b", d5, d9, lambda: -2) == -2
+
+
+def test_range_cache_limits_frames_not_cheap_values():
+    cache = RangeCache(maxsize=10, max_frames=2)
+    d = date(2026, 6, 1)
+    for i in range(3):
+        cache.get(("df", i), d, d, lambda: pd.DataFrame({"a": [i]}))
+        cache.get(("kpi", i), d, d, lambda: i)
+    assert cache.get(("df", 0), d, d, lambda: None) is None
+    assert cache.get(("df", 2), d, d, lambda: None) is not None
+    assert [cache.get(("kpi", i), d, d, lambda: None) for i in range(3)] == [0, 1, 2]
+
+
+def test_range_cache_skips_results_from_older_generation():
+    cache = RangeCache()
+    d = date(2026, 6, 1)
+    gen = cache.generation
+    cache(Change(1, APPEND, rows=(row(20),), ids=(0,)))
+    assert cache.get("k", d, d, lambda: "old", gen) == "old"
+    assert cache.get("k", d, d, lambda: "new") == "new"
+
+
+def test_range_cache_does_not_serve_newer_entry_to_older_generation():
+    cache = RangeCache()
+    d = date(2026, 6, 1)
+    old = cache.generation
+    cache(Change(1, DELETE, rows=(row(1),), ids=(0,)))
+    assert cache.get("table", date.min, date.max, lambda: "new") == "new"
+    assert cache.get("table", date.min, date.max, lambda: "old", old) == "old"
+    assert cache.get("table", date.min, date.max, lambda: None) == "new"
+
+
+def test_range_cache_serves_untouched_entry_to_later_generation():
+    cache = RangeCache()
+    d = date(2026, 6, 1)
+    cache.get("k", d, d, lambda: "kept")
+    cache(Change(1, APPEND, rows=(row(20),), ids=(0,)))
+    assert cache.get("k", d, d, lambda: None, cache.generation) == "kept"
+
+
+def test_stale_dashboard_labels_delete_the_chosen_row(make_store):
+    store = make_store([row(d + 1, commentaire=f"r{d}") for d in range(5)])
+    version, df_old, gen, _, _ = store.snapshot()   # session A, avant la suppression de B
+    store.delete([0])                            # session B
+    build_dashboard(store, 7)                    # B met la table en cache
+    _, labels = store.cache.get(("table",), date.min, date.max, lambda: _table(df_old), gen)
+    choice = next(lbl for lbl in labels if "2026-06-05" in lbl)
+    rid = int(choice.split("]")[0].replace("[", ""))
+    change = store.delete([rid], seen=version)
+    assert [r["commentaire"] for r in change.rows] == ["r4"]
@@ -0,0 +1,38 @@
+from conftest import row
+from core.dashboard import build_dashboard
+
+
+def _racing(store, monkeypatch, other):
+    """snapshot() suivi aussitôt d'une écriture d'une autre session."""
+    real = store.snapshot
+
+    def snapshot(query=""):
+        snap = real(query)
+        other()
+        return snap
+
+    monkeypatch.setattr(store, "snapshot", snapshot)
+
+
+def test_dashboard_built_from_snapshot_after_clear(make_store, monkeypatch):
+    store = make_store([row(1), row(2)])
+    version = store.version
+    _racing(store, monkeypatch, store.clear)
+    dash = build_dashboard(store, 7)
+    assert dash.version == version
+    assert dash.k.total == 2 and len(dash.labels) == 2
+
+
+def test_dashboard_kpis_match_snapshot_rows(make_store, monkeypatch):
+    store = make_store([row(1), row(2)])
+    _racing(store, monkeypatch, lambda: store.append(row(2, humeur=5)))
+    dash = build_dashboard(store, 7)
+    assert dash.k.total == len(dash.df_cur) == 2
+    assert dash.per.end_cur.day == 2
+
+
+def test_dashboard_uses_rollup_when_unchanged(make_store):
+    store = make_store([row(1, humeur=2), row(3, humeur=4)])
+    dash = build_dashboard(store, 7)
+    assert dash.k.total == 2 and dash.k.h_m == 3.0
+    assert dash.labels[0].startswith("[1] 2026-06-03")
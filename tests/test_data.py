@@ -0,0 +1,95 @@
+from datetime import date
+
+import pandas as pd
+
+from core.compact import compact, quarantine_path
+from core.data import COLS, check_rows, is_validated, load_df
+
+
+def _raw(*rows) -> pd.DataFrame:
+    return pd.DataFrame(list(rows), columns=COLS, dtype=object)
+
+
+OK = ["2026-06-01", "Marche", "30", "2", "4", "7.5", "bien"]
+
+
+def test_check_rows_keeps_valid_rows_typed():
+    clean, why = check_rows(_raw(OK))
+    assert why.tolist() == [""]
+    assert clean.iloc[0]["date"] == date(2026, 6, 1)
+    assert clean.dtypes["duree_min"] == "int64"
+    assert clean.dtypes["sommeil_h"] == "float64"
+
+
+def test_check_rows_reject_reasons():
+    def with_(i, v):
+        r = list(OK)
+        r[i] = v
+        return r
+
+    raw = _raw(
+        OK,
+        with_(0, "01/13/2026x"),
+        with_(1, "  "),
+        with_(2, "trente"),
+        with_(3, "2.5"),
+        with_(4, "6"),
+        with_(5, "25"),
+        with_(5, "-1"),
+        with_(2, "601"),
+    )
+    clean, why = check_rows(raw)
+    assert why.tolist() == [
+        "",
+        "date illisible",
+        "activité manquante",
+        "duree_min non numérique",
+        "intensite non entier",
+        "humeur hors bornes",
+        "sommeil_h hors bornes",
+        "sommeil_h hors bornes",
+        "duree_min hors bornes",
+    ]
+    assert len(clean) == 1
+
+
+def test_check_rows_keeps_first_reason():
+    raw = _raw(["pas une date", "", "x", "9", "9", "99", ""])
+    _, why = check_rows(raw)
+    assert why.tolist() == ["date illisible"]
+
+
+def test_compact_quarantines_dedups_and_marks(tmp_path):
+    csv_file = tmp_path / "bienetre.csv"
+    csv_file.write_text(
+        ",".join(COLS) + "\n"
+        "2026-06-02,Yoga,20,1,3,8,\n"
+        "2026-06-01,Marche,30,2,4,7.5,bien\n"
+        "2026-06-01,Marche,30,2,4,7.5,bien\n"
+        "2026-06-03,Vélo,30,9,4,7,\n"
+        "2026-06-04,Vélo,30\n",
+        encoding="utf-8",
+    )
+    stats = compact(csv_file)
+    assert (stats["rows"], stats["valid"], stats["rejected"], stats["duplicates"]) == (5, 2, 2, 1)
+    assert stats["reasons"] == {"intensite hors bornes": 1, "nombre de champs incorrect": 1}
+    assert is_validated(csv_file)
+    df = load_df(csv_file)
+    assert df["date"].tolist() == [date(2026, 6, 1), date(2026, 6, 2)]
+    q = pd.read_csv(quarantine_path(csv_file), keep_default_na=False)
+    assert q["ligne"].tolist() == [4, 5, 6]
+    assert q["motif"].tolist() == ["doublon", "intensite hors bornes", "nombre de champs incorrect"]
+    assert q.loc[0, "contenu"] == "2026-06-01,Marche,30,2,4,7.5,bien"
+
+
+def test_compact_keeps_every_line_somewhere(tmp_path):
+    csv_file = tmp_path / "bienetre.csv"
+    walk = "2026-06-01,Marche,30,2,4,7.0,\n"
+    csv_file.write_text(",".join(COLS) + "\n" + walk * 3, encoding="utf-8")
+    stats = compact(csv_file)
+    q = pd.read_csv(quarantine_path(csv_file), keep_default_na=False)
+    assert (stats["valid"], stats["duplicates"], stats["rejected"]) == (1, 2, 0)
+    assert len(load_df(csv_file)) + len(q) == 3
+    assert q["motif"].tolist() == ["doublon", "doublon"]
+    # réintégrables tels quels : même format que le fichier réécrit
+    assert q["contenu"].tolist() == [walk.strip()] * 2
@@ -0,0 +1,103 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from conftest import row
+from core import search
+from core.changes import DELETE, Change
+from core.search import CommentIndex, fold, tokenize
+
+
+def _index(comments, path=None, signature=lambda: None) -> CommentIndex:
+    idx = CommentIndex(path, signature)
+    idx.build(pd.DataFrame({"commentaire": comments}))
+    return idx
+
+
+def test_fold_accents_and_ligatures():
+    assert fold("Cœur ÉTÉ Æther") == "coeur ete aether"
+    assert tokenize("Bœuf, fatigué !") == ["boeuf", "fatigue"]
+
+
+def test_vectorised_build_folds_like_fold():
+    idx = _index(["mal au cœur", "Œdème léger"])
+    assert idx.search("coeur").tolist() == [0]
+    assert idx.search("oedeme").tolist() == [1]
+    assert idx.search("cœur").tolist() == [0]
+
+
+def test_search_prefix_and_all_terms():
+    idx = _index(["fatigué après la course", "course rapide", "très fatiguée"])
+    assert idx.search("fatig").tolist() == [0, 2]
+    assert idx.search("course fatig").tolist() == [0]
+    assert idx.search("natation").size == 0
+    assert idx.search("  ") is None
+
+
+def test_delete_renumbers_positions():
+    idx = _index(["a course", "b", "c course", "d", "e course"])
+    idx(Change(1, DELETE, ids=(1, 2)))
+    # restent 0, 3, 4 → renumérotées 0, 1, 2
+    assert idx.search("course").tolist() == [0, 2]
+    assert idx.search("d").tolist() == [1]
+    assert "c" not in idx.postings
+
+
+def test_reload_with_matching_signature(tmp_path):
+    path = tmp_path / "x.idx.npz"
+    _index(["course du matin", "yoga"], path, lambda: (10, 20)).save()
+    idx = CommentIndex(path, lambda: (10, 20))
+    assert idx.load()
+    assert idx.search("matin").tolist() == [0]
+    assert idx.search("yoga").tolist() == [1]
+
+
+def test_reload_rejects_mismatched_signature_or_format(tmp_path, monkeypatch):
+    path = tmp_path / "x.idx.npz"
+    _index(["course"], path, lambda: (10, 20)).save()
+    assert not CommentIndex(path, lambda: (10, 21)).load()
+    assert not CommentIndex(path, lambda: None).load()
+    monkeypatch.setattr(search, "FORMAT", search.FORMAT + 1)
+    assert not CommentIndex(path, lambda: (10, 20)).load()
+
+
+def test_reload_ignores_corrupt_file(tmp_path):
+    path = tmp_path / "x.idx.npz"
+    path.write_bytes(b"pas un npz")
+    assert not CommentIndex(path, lambda: (1, 2)).load()
+    with open(path, "wb") as f:
+        np.savez(f, meta=np.asarray(json.dumps({"signature": [1, 2], "format": search.FORMAT})))
+    assert not CommentIndex(path, lambda: (1, 2)).load()
+
+
+def test_store_hits_match_rows_after_delete(make_store):
+    store = make_store([row(1, commentaire=c) for c in ["genou", "dos", "genou droit", "genou"]])
+    store.delete([0])
+    _, df, _, hits, _ = store.snapshot("genou")
+    assert list(df.iloc[hits]["commentaire"]) == ["genou droit", "genou"]
+
+
+def test_changes_are_saved_lazily(make_store):
+    store = make_store([row(1, commentaire="genou")])
+    path = store.search.path
+    saved = path.stat().st_mtime_ns
+    store.append(row(2, commentaire="cheville"))
+    store.delete([0])
+    assert path.stat().st_mtime_ns == saved       # pas de réécriture par modification
+    # fichier en retard : sa signature n'est plus celle des données
+    assert not CommentIndex(path, lambda: store._sig).load()
+    search.flush_all()
+    reloaded = CommentIndex(path, lambda: store._sig)
+    assert reloaded.load()
+    assert reloaded.search("cheville").tolist() == [0]
+    assert reloaded.search("genou").size == 0
+
+
+def test_pending_save_runs_after_delay(tmp_path):
+    path = tmp_path / "x.idx.npz"
+    idx = _index(["course"], path, lambda: (1, 2))
+    idx.save_delay = 0.01
+    idx(Change(1, DELETE, ids=(0,)))
+    idx._timer.join(5)
+    assert path.exists() and idx not in search._unsaved
@@ -0,0 +1,58 @@
+import os
+
+from conftest import row
+from core.data import load_df
+
+
+def _comments(store):
+    return list(store.df["commentaire"])
+
+
+def test_rebase_across_appends_and_other_deletes(make_store):
+    store = make_store([row(1, commentaire=f"r{i}") for i in range(6)])
+    seen = store.version
+    store.append(row(2, commentaire="new"))
+    store.delete([0, 2])          # autre session
+    store.append(row(3, commentaire="new2"))
+    assert store._rebase([1, 3, 5], seen) == [0, 1, 3]
+    assert store._rebase([2], seen) == []
+
+
+def test_delete_with_stale_version_removes_intended_rows(make_store):
+    store = make_store([row(1, commentaire=f"r{i}") for i in range(5)])
+    seen = store.version
+    store.delete([1])
+    change = store.delete([3, 4], seen=seen)
+    assert [r["commentaire"] for r in change.rows] == ["r3", "r4"]
+    assert _comments(store) == ["r0", "r2"]
+    assert list(load_df(store.csv_file)["commentaire"].fillna("")) == ["r0", "r2"]
+
+
+def test_delete_after_reset_is_refused(make_store):
+    store = make_store([row(1, commentaire=f"r{i}") for i in range(3)])
+    seen = store.version
+    store.reload()
+    assert store.delete([0], seen=seen) is None
+    assert len(store.df) == 3
+
+
+def test_delete_of_already_deleted_rows_writes_nothing(make_store):
+    store = make_store([row(1, commentaire=f"r{i}") for i in range(3)])
+    seen = store.version
+    store.delete([1])
+    version, mtime = store.version, os.stat(store.csv_file).st_mtime_ns
+    change = store.delete([1], seen=seen)
+    assert change is not None and change.ids == ()
+    assert store.version == version
+    assert os.stat(store.csv_file).st_mtime_ns == mtime
+    assert _comments(store) == ["r0", "r2"]
+
+
+def test_rollup_and_activities_follow_deletes(make_store):
+    store = make_store([row(1, "Marche"), row(2, "Yoga"), row(2, "Yoga")])
+    store.delete([0])
+    assert store.activity_options() == ["Yoga"]
+    assert store.last_day().day == 2
+    store.delete([0, 1])
+    assert store.activity_options() == []
+    assert store.last_day() is None
@@ -0,0 +1,13 @@
+"""
+Éléments d'interface construits une fois par processus (icônes SVG,
+palettes, feuille de style), importés par app.py à chaque rerun sans
+être recalculés.
+
+Les gabarits HTML (cartes KPI, masques, analyse, pied de page) sont
+compilés une fois dans ui.templates et leur rendu est mis en cache par
+valeurs d'entrée.
+"""
+from ui.icons import ICO, ICONS, ico, svg_icon
+from ui.theme import PALETTE_DARK, PALETTE_LIGHT, build_css, css_bg
+
+__all__ = ["ICO", "ICONS", "ico", "svg_icon", "PALETTE_DARK", "PALETTE_LIGHT", "build_css", "css_bg"]
@@ -0,0 +1,25 @@
+# ============================================================
+# SVG ICONS (construites une fois par processus)
+# ============================================================
+ICONS = {
+    "calendar": """<svg viewBox="0 0 24 24" aria-hidden="true"><rect x="3" y="4.5" width="18" height="16" rx="3"/><path d="M8 3v3"/><path d="M16 3v3"/><path d="M3 9h18"/></svg>""",
+    "timer": """<svg viewBox="0 0 24 24" aria-hidden="true"><path d="M10 2h4"/><path d="M12 14v-4"/><path d="M12 22a8 8 0 1 0-8-8"/></svg>""",
+    "smile": """<svg viewBox="0 0 24 24" aria-hidden="true"><path d="M8.5 14.5c1 1.2 2.2 2 3.5 2s2.5-.8 3.5-2"/><path d="M9 10h.01"/><path d="M15 10h.01"/><circle cx="12" cy="12" r="9"/></svg>""",
+    "moon": """<svg viewBox="0 0 24 24" aria-hidden="true"><path d="M21 13a8.5 8.5 0 1 1-10-10 7 7 0 0 0 10 10z"/></svg>""",
+    "fire": """<svg viewBox="0 0 24 24" aria-hidden="true"><path d="M12 22c4 0 7-3 7-7 0-3-2-5-4-7 0 2-1 3-2 4-1-2-2-3-2-6C7 8 5 11 5 15c0 4 3 7 7 7z"/></svg>""",
+    "flag": """<svg viewBox="0 0 24 24" aria-hidden="true"><path d="M5 3v18"/><path d="M5 4h12l-2 4 2 4H5"/></svg>""",
+    "trend": """<svg viewBox="0 0 24 24" aria-hidden="true"><path d="M4 16l6-6 4 4 6-8"/><path d="M20 7v5h-5"/></svg>""",
+    "alert": """<svg viewBox="0 0 24 24" aria-hidden="true"><path d="M12 9v5"/><path d="M12 17h.01"/><path d="M10.3 4.2l-8 14A2 2 0 0 0 4 21h16a2 2 0 0 0 1.7-2.8l-8-14a2 2 0 0 0-3.4 0z"/></svg>""",
+    "bolt": """<svg viewBox="0 0 24 24" aria-hidden="true"><path d="M13 2L3 14h7l-1 8 12-14h-7l-1-6z"/></svg>""",
+    "eye": """<svg viewBox="0 0 24 24" aria-hidden="true"><path d="M2 12s3.5-7 10-7 10 7 10 7-3.5 7-10 7-10-7-10-7z"/><circle cx="12" cy="12" r="3"/></svg>""",
+    "sync": """<svg viewBox="0 0 24 24" aria-hidden="true"><path d="M21 12a9 9 0 0 1-15.36 6.36"/><path d="M3 12a9 9 0 0 1 15.36-6.36"/><path d="M21 3v6h-6"/><path d="M3 21v-6h6"/></svg>""",
+    "info": """<svg viewBox="0 0 24 24" aria-hidden="true"><circle cx="12" cy="12" r="9"/><path d="M12 10v7"/><path d="M12 7h.01"/></svg>""",
+}
+
+ICO = {name: f"<div class='ico'>{svg}</div>" for name, svg in ICONS.items()}
+
+def svg_icon(name: str) -> str:
+    return ICONS.get(name, ICONS["info"])
+
+def ico(name: str) -> str:
+    return ICO.get(name, ICO["info"])
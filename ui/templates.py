@@ -0,0 +1,178 @@
+from functools import lru_cache
+from string import Template
+from typing import Tuple
+
+from ui.icons import ICONS, ICO
+
+# ============================================================
+# COMPILATION (une fois par processus)
+# ============================================================
+def compact(html: str) -> str:
+    """Retire l'indentation de chaque ligne (évite l'affichage en bloc de code)."""
+    return "\n".join(line.lstrip() for line in html.splitlines())
+
+def compile_html(src: str, **static) -> Template:
+    """
+    Compacte le gabarit et y fige les parties constantes (icônes...) :
+    au rendu, seules les valeurs variables restent à substituer.
+    """
+    return Template(Template(compact(src)).safe_substitute(static))
+
+
+# ============================================================
+# GABARITS
+# ============================================================
+HEADER = compile_html("""
+<div class="logoRow">
+  <div class="logoIcon"><div class="logoW">WS</div></div>
+  <div style="flex:1;min-width:0;">
+    <div class="h1">$app_name</div>
+
+    <div class="pills">
+      <span class="pill">$bolt Boost ton énergie</span>
+      <span class="pill">$eye Suis tes habitudes</span>
+      <span class="pill">$sync Compare tes tendances</span>
+    </div>
+
+    <div class="goalLine">
+      Pilotage simple de l’activité, du sommeil et du bien-être.
+      <span style="opacity:.88;">Ce qui s’améliore, ce qui baisse : tout est visible.</span>
+    </div>
+  </div>
+</div>
+""", bolt=ICONS["bolt"], eye=ICONS["eye"], sync=ICONS["sync"])
+
+ANALYSIS = compile_html("""
+<div class="analyseTitle">
+  $info Analyse
+</div>
+<div class="analyseText">
+  <b>Principe :</b> tu saisis tes sessions (activité, intensité, bien-être, sommeil).
+  Le tableau de bord calcule les indicateurs sur la période filtrée, puis compare la période sélectionnée
+  à la période précédente de même durée (<b>↑ / ↓</b>) pour visualiser les tendances.
+</div>
+""", info=ICONS["info"])
+
+ANALYSIS_DATES = compile_html("""
+<div class="anaDates">
+  <span class="tag">$calendar Période analysée</span>
+  <span class="val">$cur</span>
+  <span style="opacity:.55;">|</span>
+  <span class="tag">$trend Comparaison</span>
+  <span class="val">$prev</span>
+</div>
+""", calendar=ICONS["calendar"], trend=ICONS["trend"])
+
+KPI_CARD = compile_html("""
+<div class='kpi'>
+  <div class='kTop'>
+    <div class='kLeft'>$icon<div class='klabel'>$label</div></div>
+  </div>
+  <div class='kval'>$value</div>
+  <div class='ksub'>$sub</div>
+</div>
+""")
+
+MASK = compile_html("<div class='mask'>$body</div>")
+
+MASK_MINI = compile_html("<div class='mask-mini'><b>$title</b><div class='sub'>$sub</div></div>")
+
+INSIGHTS = compile_html("""
+<div class='mask'>
+  <div class="sTitle">$trend Points forts</div>
+  <ul class="sList" style="margin:0 0 10px 18px;padding:0;">$forts</ul>
+
+  <div style="height:10px"></div>
+  <div style="height:1px;background:var(--line);"></div>
+  <div style="height:10px"></div>
+
+  <div class="sTitle">$alert Points d’attention</div>
+  <ul class="sList" style="margin:0 0 0 18px;padding:0;">$att</ul>
+</div>
+""", trend=ICO["trend"], alert=ICO["alert"])
+
+SYNTHESIS = compile_html("""
+<div class='mask'>
+  <div class="sTitle">$flag Synthèse</div>
+  <div style="margin-top:6px;font-size:26px;font-weight:950;color:var(--ink);line-height:1.15">$syn1</div>
+  <div style="margin-top:10px;color:var(--muted);font-weight:850;line-height:1.55;font-size:14px">$syn2</div>
+</div>
+""", flag=ICO["flag"])
+
+RECO = compile_html("""
+<div class="mask">
+  <div class="sTitle">$trend Recommandations</div>
+  <ul style="margin:0 0 0 18px;padding:0;">
+    $items
+  </ul>
+</div>
+""", trend=ICO["trend"])
+
+FOOTER = compile_html("""
+<div class="footer">
+  <strong>$app_name</strong> — pilotage des habitudes & consolidation des indicateurs.
+  <span style="float:right;">© $app_name</span>
+</div>
+""")
+
+
+# ============================================================
+# RENDU (mis en cache par valeurs d'entrée)
+# ============================================================
+def delta_chip(v, unit="", positive_is_good=True):
+    if v is None:
+        return ""
+    arrow = "↑" if v > 0 else ("↓" if v < 0 else "•")
+    good = (v >= 0) if positive_is_good else (v <= 0)
+    cls = "ok" if good else "warn"
+    if isinstance(v, float):
+        label = f"{'+' if v >= 0 else ''}{v:.2f}{unit}"
+    else:
+        label = f"{'+' if v >= 0 else ''}{v}{unit}"
+    return f"<span class='delta {cls}'>{arrow} {label}</span>"
+
+@lru_cache(maxsize=8)
+def header(app_name: str) -> str:
+    return HEADER.substitute(app_name=app_name)
+
+@lru_cache(maxsize=1)
+def analysis() -> str:
+    return ANALYSIS.substitute()
+
+@lru_cache(maxsize=256)
+def analysis_dates(cur: str, prev: str) -> str:
+    return ANALYSIS_DATES.substitute(cur=cur, prev=prev)
+
+@lru_cache(maxsize=1024)
+def kpi_card(icon: str, label: str, value: str, sub: str) -> str:
+    return KPI_CARD.substitute(icon=ICO.get(icon, ICO["info"]), label=label, value=value, sub=sub)
+
+@lru_cache(maxsize=64)
+def mask(body: str) -> str:
+    return MASK.substitute(body=body)
+
+@lru_cache(maxsize=64)
+def mask_mini(title: str, sub: str) -> str:
+    return MASK_MINI.substitute(title=title, sub=sub)
+
+@lru_cache(maxsize=256)
+def insights(forts: Tuple[str, ...], att: Tuple[str, ...]) -> str:
+    return INSIGHTS.substitute(
+        forts="".join(f"<li>{x}</li>" for x in forts),
+        att="".join(f"<li>{x}</li>" for x in att),
+    )
+
+@lru_cache(maxsize=256)
+def synthesis(syn1: str, syn2: str) -> str:
+    return SYNTHESIS.substitute(syn1=syn1, syn2=syn2)
+
+@lru_cache(maxsize=64)
+def recommendations(reco: Tuple[Tuple[str, str], ...]) -> str:
+    items = "".join(
+        f"<li style='margin-top:8px;color:var(--muted);font-weight:900'><b>✅ {t}</b> — {x}</li>" for t, x in reco
+    )
+    return RECO.substitute(items=items)
+
+@lru_cache(maxsize=8)
+def footer(app_name: str) -> str:
+    return FOOTER.substitute(app_name=app_name)
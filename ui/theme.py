@@ -0,0 +1,265 @@
+from base64 import b64encode
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from ui.templates import compact
+
+# ============================================================
+# PALETTES (clair / sombre)
+# ============================================================
+PALETTE_LIGHT = """
+:root{
+  --ink:#0b1412;
+  --muted:rgba(11,20,18,.62);
+  --line:rgba(11,20,18,.12);
+
+  --maskA:rgba(255,255,255,.62);
+  --maskB:rgba(255,255,255,.50);
+
+  --okBg:rgba(15,91,69,.14); --okInk:#0f5b45;
+  --warnBg:rgba(225,120,0,.14); --warnInk:#b75a00;
+
+  --accent:#23b9ad;
+  --btn1:#0f5b45;
+  --btn2:#23b9ad;
+
+  --maskTint1: rgba(35,185,173,.14);
+  --maskTint2: rgba(15,91,69,.12);
+}
+"""
+
+PALETTE_DARK = """
+:root{
+  --ink:#eef7f4;
+  --muted:rgba(238,247,244,.72);
+  --line:rgba(238,247,244,.14);
+
+  --maskA:rgba(8,14,13,.54);
+  --maskB:rgba(8,14,13,.44);
+
+  --okBg:rgba(126,224,196,.18); --okInk:#bff7ea;
+  --warnBg:rgba(255,166,77,.18); --warnInk:#ffd1a3;
+
+  --accent:#7dd3fc;
+  --btn1:#7ee0c4;
+  --btn2:#7dd3fc;
+
+  --maskTint1: rgba(125,211,252,.14);
+  --maskTint2: rgba(126,224,196,.10);
+}
+"""
+
+
+# ============================================================
+# CSS BACKGROUND (image + voile)
+# ============================================================
+@lru_cache(maxsize=8)
+def _b64(path: Path, mtime_ns: int) -> str:
+    # la clé inclut mtime_ns : une image remplacée est relue, sinon jamais
+    return b64encode(path.read_bytes()).decode()
+
+def css_bg(bg_path: Path, veil: float, dark: bool):
+    mime = "png" if bg_path.suffix.lower() == ".png" else "jpeg"
+    b64 = _b64(bg_path, bg_path.stat().st_mtime_ns)
+    overlay = (
+        f"linear-gradient(180deg, rgba(0,0,0,{veil}) 0%, rgba(0,0,0,{min(veil+0.15,0.95)}) 100%)"
+        if dark
+        else f"linear-gradient(180deg, rgba(255,255,255,{veil}) 0%, rgba(255,255,255,{min(veil+0.15,0.95)}) 100%)"
+    )
+    return f"""
+    .stApp {{
+      background-image: {overlay}, url("data:image/{mime};base64,{b64}");
+      background-size: cover;
+      background-position: center;
+      background-attachment: fixed;
+    }}
+    """
+
+
+# ============================================================
+# FEUILLE DE STYLE COMPLÈTE (corps mis en cache par thème)
+# ============================================================
+def build_css(dark: bool, veil: float, bg: Optional[Path]) -> str:
+    # le fond (image base64 de plusieurs Mo, déjà en cache dans _b64) est
+    # assemblé à chaque appel ; seul le reste, qui ne dépend que du thème,
+    # est mis en cache
+    head = compact(f"""
+<style>
+{PALETTE_DARK if dark else PALETTE_LIGHT}
+{css_bg(bg, veil, dark) if bg else ""}
+""")
+    return head + "\n" + _css_body(dark)
+
+@lru_cache(maxsize=2)
+def _css_body(dark: bool) -> str:
+    return compact(f"""
+header[data-testid="stHeader"]{{background:transparent!important;}}
+.block-container{{max-width:1180px;padding-top:1.1rem!important;padding-bottom:1.2rem!important;}}
+.stCaption, small{{color:var(--muted)!important;}}
+
+section[data-testid="stSidebar"]{{
+  background: rgba(255,255,255,.55);
+  {"background: rgba(8,14,13,.42);" if dark else ""}
+  border-right: 1px solid var(--line);
+  backdrop-filter: blur(10px);
+}}
+
+/* MASQUES COLORÉS */
+.mask{{
+  background: linear-gradient(135deg, var(--maskTint1), var(--maskTint2)), var(--maskA);
+  border: 1px solid var(--line);
+  border-radius: 18px;
+  padding: 16px 18px;
+  margin-bottom: 16px;
+  backdrop-filter: blur(12px);
+}}
+.mask-mini{{
+  background: linear-gradient(135deg, var(--maskTint1), rgba(255,255,255,.10));
+  {"background: linear-gradient(135deg, var(--maskTint1), rgba(8,14,13,.08));" if dark else ""}
+  border: 1px solid var(--line);
+  border-radius: 12px;
+  padding: 8px 10px;
+  margin-bottom: 10px;
+  backdrop-filter: blur(8px);
+}}
+.mask-mini b{{font-size:13px;color:var(--ink);}}
+.mask-mini .sub{{margin-top:2px;font-size:12px;color:var(--muted);font-weight:750;}}
+
+/* Boutons */
+div[data-testid="stButton"] > button{{
+  border: none !important;
+  border-radius: 999px !important;
+  padding: .80rem 1.10rem !important;
+  font-weight: 950 !important;
+  color: white !important;
+  background: linear-gradient(90deg, var(--btn1), var(--btn2)) !important;
+  box-shadow: 0 12px 26px rgba(0,0,0,.16) !important;
+  transition: transform .14s ease, filter .14s ease, box-shadow .14s ease !important;
+}}
+div[data-testid="stButton"] > button:hover{{
+  transform: translateY(-1px) !important;
+  filter: brightness(1.03) !important;
+  box-shadow: 0 16px 34px rgba(0,0,0,.20) !important;
+}}
+
+/* Download buttons */
+div[data-testid="stDownloadButton"] > button{{
+  border: none !important;
+  border-radius: 999px !important;
+  padding: .80rem 1.10rem !important;
+  font-weight: 950 !important;
+  color: white !important;
+  background: linear-gradient(90deg, var(--btn1), var(--btn2)) !important;
+  box-shadow: 0 12px 26px rgba(0,0,0,.16) !important;
+  transition: transform .14s ease, filter .14s ease, box-shadow .14s ease !important;
+}}
+div[data-testid="stDownloadButton"] > button:hover{{
+  transform: translateY(-1px) !important;
+  filter: brightness(1.03) !important;
+  box-shadow: 0 16px 34px rgba(0,0,0,.20) !important;
+}}
+div[data-testid="stDownloadButton"] > button:disabled{{
+  opacity: .55 !important;
+  filter: grayscale(.15) !important;
+}}
+
+/* Header sans masque */
+.logoRow{{display:flex;align-items:flex-start;gap:18px;margin-bottom:16px;}}
+.logoIcon{{
+  width:96px;height:96px;border-radius:22px;
+  display:flex;align-items:center;justify-content:center;
+  background:
+    radial-gradient(circle at 30% 25%, rgba(255,255,255,.28), transparent 60%),
+    linear-gradient(135deg, var(--accent), rgba(15,91,69,.92));
+  {"background: radial-gradient(circle at 30% 25%, rgba(255,255,255,.14), transparent 60%), linear-gradient(135deg, var(--accent), rgba(126,224,196,.55));" if dark else ""}
+  box-shadow: 0 18px 44px rgba(0,0,0,.20);
+  border: 1px solid rgba(255,255,255,.18);
+  flex: 0 0 auto;
+}}
+.logoW{{font-size:40px;font-weight:950;color:white;line-height:1;text-shadow:0 12px 22px rgba(0,0,0,.28);letter-spacing:-0.03em;}}
+.h1{{font-size:44px;font-weight:950;letter-spacing:-0.02em;color:var(--ink);margin:0;line-height:1.05;}}
+
+.pills{{display:flex;gap:12px;flex-wrap:wrap;margin-top:10px;margin-bottom:10px;}}
+.pill{{
+  display:inline-flex;align-items:center;gap:10px;
+  padding: 10px 14px;
+  border-radius: 999px;
+  border: 1px solid rgba(0,0,0,.10);
+  {"border: 1px solid rgba(255,255,255,.14);" if dark else ""}
+  font-weight: 950;
+  color: rgba(0,0,0,.80);
+  box-shadow: 0 10px 22px rgba(0,0,0,.10);
+}}
+.pills .pill:nth-child(1){{background: linear-gradient(135deg, rgba(35,185,173,.35), rgba(15,91,69,.20));}}
+.pills .pill:nth-child(2){{background: linear-gradient(135deg, rgba(125,211,252,.40), rgba(35,185,173,.22));}}
+.pills .pill:nth-child(3){{background: linear-gradient(135deg, rgba(255,166,77,.38), rgba(125,211,252,.20));}}
+.pill svg{{width:18px;height:18px;stroke:rgba(0,0,0,.78);stroke-width:2;fill:none;opacity:.95;}}
+{" .pill svg{stroke:rgba(10,14,13,.92);} " if dark else ""}
+
+.goalLine{{
+  margin-top: 8px;
+  color: rgba(0,0,0,.80);
+  {"color: rgba(255,255,255,.86);" if dark else ""}
+  font-weight: 900;
+  font-size: 18px;
+  line-height: 1.45;
+}}
+
+.analyseTitle{{display:flex;align-items:center;gap:10px;margin-top:10px;margin-bottom:6px;font-size:26px;font-weight:950;color:var(--ink);}}
+.analyseTitle svg{{width:22px;height:22px;stroke:var(--ink);stroke-width:2;fill:none;opacity:.95;}}
+.analyseText{{color: rgba(0,0,0,.78);{"color: rgba(255,255,255,.86);" if dark else ""}font-weight:850;font-size:16px;line-height:1.6;margin-bottom:10px;}}
+
+.ico{{width:30px;height:30px;border-radius:10px;border:1px solid var(--line);
+  background: rgba(255,255,255,.22);
+  {"background: rgba(8,14,13,.24);" if dark else ""}
+  display:flex;align-items:center;justify-content:center;backdrop-filter: blur(10px);flex:0 0 auto;
+}}
+.ico svg{{width:18px;height:18px;stroke:var(--ink);stroke-width:2;fill:none;stroke-linecap:round;stroke-linejoin:round;opacity:.95;}}
+
+.kpi{{background:var(--maskB);border:1px solid var(--line);border-radius:16px;padding:12px 14px;height:132px;
+  display:flex;flex-direction:column;justify-content:space-between;margin-bottom:16px;backdrop-filter: blur(12px);
+}}
+.kTop{{display:flex;align-items:center;justify-content:space-between;gap:10px;}}
+.kLeft{{display:flex;align-items:center;gap:10px;min-width:0;}}
+.klabel{{font-size:10px;font-weight:900;letter-spacing:.12em;text-transform:uppercase;color:var(--muted);white-space:nowrap;}}
+.kval{{font-size:32px;font-weight:950;color:var(--ink);line-height:1.0;}}
+.ksub{{font-weight:800;font-size:13px;color:rgba(0,0,0,.60);{"color: rgba(255,255,255,.74);" if dark else ""}}}
+
+.delta{{display:inline-flex;align-items:center;gap:6px;padding:4px 8px;border-radius:999px;border:1px solid var(--line);font-weight:900;font-size:11px;}}
+.delta.ok{{background:var(--okBg);color:var(--okInk);}}
+.delta.warn{{background:var(--warnBg);color:var(--warnInk);}}
+
+.anaDates{{
+  margin-top: 8px;
+  margin-bottom: 12px;
+  padding: 10px 12px;
+  border-radius: 12px;
+  border: 1px solid var(--line);
+  background: rgba(255,255,255,.22);
+  {"background: rgba(8,14,13,.20);" if dark else ""}
+  color: rgba(0,0,0,.78);
+  {"color: rgba(255,255,255,.86);" if dark else ""}
+  font-weight: 900;
+  font-size: 14px;
+  display:flex;
+  align-items:center;
+  gap:10px;
+  flex-wrap: wrap;
+}}
+.anaDates .tag{{display:inline-flex;align-items:center;gap:8px;padding:6px 10px;border-radius:999px;border:1px solid var(--line);
+  background: rgba(255,255,255,.18);
+  {"background: rgba(8,14,13,.20);" if dark else ""}
+  font-weight: 900;
+}}
+.anaDates .tag svg{{width:16px;height:16px;stroke:var(--ink);stroke-width:2;fill:none;opacity:.95;}}
+.anaDates .val{{font-weight:950;color:var(--ink);}}
+
+.sTitle{{display:flex;align-items:center;gap:10px;font-size:18px;font-weight:950;color:var(--ink);margin-bottom:8px;}}
+.sTitle .ico{{width:34px;height:34px;border-radius:12px;}}
+.sList li{{margin-top:8px;color:var(--muted);font-weight:850;}}
+
+.footer{{margin-top:14px;color: rgba(0,0,0,.72);{"color: rgba(255,255,255,.80);" if dark else ""}font-weight:950;font-size:18px;padding:0 2px;}}
+.footer strong{{color:var(--ink);font-size:20px;}}
+</style>
+""")